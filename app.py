@@ -7,6 +7,7 @@ import sys
 import os
 import json
 import logging
+from concurrent.futures import wait
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -20,6 +21,12 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 import gradio as gr
 from pipeline.router import TranscriptRouter, VideoToTextNode
+from llm.response_cache import cache_stats_since, get_llm_cache
+from pipeline.scheduler import VideoJob, get_scheduler
+from pipeline.result_store import get_result_store
+from fetch_transcript.youtube_fetcher import YouTubeTranscriptFetcher
+from fetch_transcript.transcript_cache import get_transcript_cache
+from preprocess.transcript_columns import TranscriptColumns
 
 # Configure logging
 logging.basicConfig(
@@ -28,6 +35,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+PROGRESS_POLL_SECONDS = 0.5
+# Số request Gradio chạy cùng lúc (mặc định của Gradio là 1 → mọi request xếp hàng
+# trước cả scheduler). Handler chủ yếu chờ job → giới hạn tài nguyên thật là slot của scheduler
+GRADIO_CONCURRENCY_LIMIT = int(os.getenv("GRADIO_CONCURRENCY_LIMIT", 16))
+# Stage của scheduler → (progress, mô tả)
+STAGE_PROGRESS = {
+    "fetch": (0.1, "🔄 Đang tải transcript..."),
+    "asr": (0.3, "🎙️ Đang chuyển giọng nói thành văn bản (Whisper)..."),
+    "llm": (0.5, "🤖 Đang tóm tắt với AI..."),
+}
+
 
 def extract_video_id(url_or_id: str) -> str:
     """Extract video ID from YouTube URL or return as-is if already an ID."""
@@ -57,7 +75,44 @@ def extract_video_id(url_or_id: str) -> str:
     return url_or_id[:11] if len(url_or_id) >= 11 else url_or_id
 
 
-def process_video(youtube_url: str, summary_language: str, progress=gr.Progress()):
+def format_metadata(video_id: str, title: str, language: str, duration_min: float, source: str) -> str:
+    video_url = f"https://www.youtube.com/watch?v={video_id}"
+    return f"""🎬 **Tiêu đề:** {title}
+🔗 **URL:** [{video_url}]({video_url})
+📹 **Video ID:** {video_id}
+🌐 **Ngôn ngữ:** {language}
+⏱️ **Thời lượng:** {duration_min:.2f} phút
+📝 **Nguồn transcript:** {source}"""
+
+
+def format_summary(result_dict: dict) -> str:
+    # Handle both short flow (summary) and long flow (global_summary)
+    overall_summary = result_dict.get("global_summary") or result_dict.get("summary", "Không có tóm tắt")
+    
+    # Add section takeaways if available (long video)
+    if "section_takeaways" in result_dict and result_dict["section_takeaways"]:
+        sections_text = "\n\n---\n\n## 📑 Takeaways theo phần:\n\n"
+        for section in result_dict["section_takeaways"]:
+            title = section.get("title", "Untitled")
+            section_id = section.get("section_id", 0)
+            takeaways = section.get("takeaways", [])
+            sections_text += f"### {section_id}. {title}\n"
+            for takeaway in takeaways:
+                sections_text += f"- {takeaway}\n"
+            sections_text += "\n"
+        overall_summary += sections_text
+    return overall_summary
+
+
+def stored_transcript_text(video_id: str) -> str:
+    """Transcript for the UI from the local transcript cache (no network)."""
+    cached = get_transcript_cache().lookup(video_id, YouTubeTranscriptFetcher().languages)
+    if cached is None:
+        return ""
+    return TranscriptColumns.from_payload(cached.transcript).timestamped()
+
+
+def process_video(youtube_url: str, summary_language: str, refresh: bool = False, progress=gr.Progress()):
     """
     Main processing function for Gradio.
     Returns: (overall_summary, transcript_text, metadata_info, json_output)
@@ -73,72 +128,100 @@ def process_video(youtube_url: str, summary_language: str, progress=gr.Progress(
         video_id = extract_video_id(youtube_url)
         logger.info(f"Processing video: {video_id}")
         
-        # Step 1: Fetch transcript
-        progress(0.1, desc="🔄 Đang tải transcript...")
-        video_to_text_node = VideoToTextNode()
-        transcript_result = video_to_text_node.run(video_id)
+        # Output language: provided or default to video language
+        output_language = summary_language.strip() if summary_language else None
         
-        if not transcript_result.ok:
-            return f"❌ Không thể lấy transcript: {transcript_result.error}", "", ""
+        # Kết quả đã lưu → trả về ngay, không fetch / LLM
+        result_store = get_result_store()
+        if not refresh:
+            stored = result_store.get(video_id, output_language)
+            if stored is not None:
+                logger.info(f"Result store hit for {video_id} (saved {stored.age_seconds / 3600:.1f}h ago)")
+                meta = stored.metadata
+                result_dict = stored.result.model_dump()
+                metadata = format_metadata(
+                    video_id,
+                    meta.get("title") or "Unknown",
+                    meta.get("language") or "Unknown",
+                    meta.get("duration_minutes") or 0,
+                    meta.get("source") or "YouTube",
+                ) + "\n💾 **Kết quả đã lưu** (chọn \"Làm mới\" để tóm tắt lại)"
+                return (
+                    format_summary(result_dict),
+                    stored_transcript_text(video_id),
+                    metadata,
+                    json.dumps(result_dict, indent=2, ensure_ascii=False),
+                )
         
-        transcript_data = transcript_result.transcript
-        transcript_text = transcript_data.get("text", "")
+        # Fetch → (ASR) → summarize chạy trên các stage của scheduler dùng chung,
+        # thread của request chỉ đợi kết quả
+        scheduler = get_scheduler()
+        cache_before = get_llm_cache().stats()
+        # Cùng video + ngôn ngữ đang chạy (request khác, cần GRADIO_CONCURRENCY_LIMIT > 1)
+        # → dùng chung job đó
+        own_job = VideoJob(video_id, summary_language=output_language, refresh=refresh)
+        job = scheduler.submit(
+            own_job,
+            VideoToTextNode(stream_asr=os.getenv("ASR_STREAMING", "0") == "1"),
+            TranscriptRouter(),
+        )
+        joined = job is not own_job
+        while not job.future.done():
+            fraction, desc = STAGE_PROGRESS[job.stage]
+            queued = scheduler.stats()[job.stage]["queued"]
+            progress(fraction, desc=f"{desc} (hàng đợi: {queued})" if queued else desc)
+            wait([job.future], timeout=PROGRESS_POLL_SECONDS)
         
-        # Metadata info
-        source = transcript_data.get("source", "YouTube")
-        language = transcript_data.get("language", "Unknown")
-        duration_min = transcript_data.get("duration", {}).get("minutes", 0)
+        logger.info(f"Job timings for {video_id}: {job.timings}")
+        logger.info(f"Scheduler: {scheduler.format_stats()}")
         
-        # Get video metadata (title, etc.)
-        video_metadata = transcript_result.metadata or {}
-        video_title = video_metadata.get("title", "Unknown")
-        video_url = f"https://www.youtube.com/watch?v={video_id}"
+        if job.error is not None:
+            if job.stage in ("fetch", "asr"):
+                return f"❌ Không thể lấy transcript: {job.error}", "", "", ""
+            raise RuntimeError(job.error)
         
-        metadata = f"""🎬 **Tiêu đề:** {video_title}
-🔗 **URL:** [{video_url}]({video_url})
-📹 **Video ID:** {video_id}
-🌐 **Ngôn ngữ:** {language}
-⏱️ **Thời lượng:** {duration_min:.2f} phút
-📝 **Nguồn transcript:** {source}"""
-        
-        # Step 2: Summarize
-        progress(0.5, desc="🤖 Đang tóm tắt với AI...")
+        transcript_result = job.transcript
+        if transcript_result.timings:
+            logger.info(
+                f"Fetch timing for {video_id}: wall {transcript_result.timings['wall_seconds']:.2f}s, "
+                f"saved {transcript_result.timings['saved_seconds']:.2f}s by running "
+                f"transcript + metadata concurrently"
+            )
         
-        # Use provided language or default to video language
-        output_language = summary_language.strip() if summary_language else None
+        transcript_data = transcript_result.transcript
+        # Hiển thị transcript kèm timestamp, dựng từ columns
+        transcript_text = TranscriptColumns.from_payload(transcript_data).timestamped()
         
-        transcription_router = TranscriptRouter()
-        result = transcription_router.route(
-            video_id=video_id,
-            transcript=transcript_result,
-            summary_language=output_language
+        # Metadata info
+        video_metadata = transcript_result.metadata or {}
+        metadata = format_metadata(
+            video_id,
+            video_metadata.get("title", "Unknown"),
+            transcript_data.get("language", "Unknown"),
+            transcript_data.get("duration", {}).get("minutes", 0),
+            transcript_data.get("source", "YouTube"),
         )
         
+        if joined:
+            metadata += "\n🔗 **Dùng chung kết quả với một yêu cầu khác đang xử lý video này**"
+        
+        result = job.result
+        # Job dùng chung: request tạo job lưu kết quả, không ghi lại lần nữa
+        if not joined:
+            result_store.put(video_id, output_language, result, transcript_result)
+        cache_stats = cache_stats_since(cache_before)
+        logger.info(f"LLM cache for {video_id}: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+        
         progress(0.9, desc="✅ Hoàn thành!")
         
         # Format overall summary
         result_dict = result.model_dump()
-        
-        # Handle both short flow (summary) and long flow (global_summary)
-        overall_summary = result_dict.get("global_summary") or result_dict.get("summary", "Không có tóm tắt")
-        
-        # Add section takeaways if available (long video)
-        if "section_takeaways" in result_dict and result_dict["section_takeaways"]:
-            sections_text = "\n\n---\n\n## 📑 Takeaways theo phần:\n\n"
-            for section in result_dict["section_takeaways"]:
-                title = section.get("title", "Untitled")
-                section_id = section.get("section_id", 0)
-                takeaways = section.get("takeaways", [])
-                sections_text += f"### {section_id}. {title}\n"
-                for takeaway in takeaways:
-                    sections_text += f"- {takeaway}\n"
-                sections_text += "\n"
-            overall_summary += sections_text
+        overall_summary = format_summary(result_dict)
         
         # Format JSON output
         json_output = json.dumps(result_dict, indent=2, ensure_ascii=False)
         
-        return overall_summary, transcript_result.transcript.get("raw_text", transcript_result.transcript.get("text", "")), metadata, json_output
+        return overall_summary, transcript_text, metadata, json_output
         
     except Exception as e:
         logger.error(f"Error processing video: {str(e)}", exc_info=True)
@@ -180,6 +263,10 @@ with gr.Blocks(
                 lines=1,
                 value=""
             )
+            refresh_input = gr.Checkbox(
+                label="🔄 Làm mới (tóm tắt lại, bỏ qua kết quả / cache đã lưu)",
+                value=False
+            )
     
     submit_btn = gr.Button("🚀 Tóm tắt video", variant="primary", size="lg")
     
@@ -212,8 +299,9 @@ with gr.Blocks(
     # Event handling
     submit_btn.click(
         fn=process_video,
-        inputs=[url_input, language_input],
-        outputs=[summary_output, transcript_output, metadata_output, json_output]
+        inputs=[url_input, language_input, refresh_input],
+        outputs=[summary_output, transcript_output, metadata_output, json_output],
+        concurrency_limit=GRADIO_CONCURRENCY_LIMIT,
     )
     
     # Examples
@@ -245,6 +333,18 @@ if __name__ == "__main__":
     
     PORT = 7870
     
+    # Preload Whisper in background so the first video without captions is fast
+    if os.getenv("WHISPER_PRELOAD", "1") == "1":
+        def _preload_whisper():
+            try:
+                from pipeline.audio_summary import warmup_asr_model
+                warmup_asr_model()
+                logger.info("Whisper model preloaded")
+            except Exception as e:
+                logger.warning(f"Whisper preload failed: {e}")
+        
+        threading.Thread(target=_preload_whisper, name="whisper-preload", daemon=True).start()
+    
     # Try to use ngrok for public URL
     use_ngrok = True
     ngrok_url = None
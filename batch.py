@@ -0,0 +1,116 @@
+"""
+YouTube Transcript Summarization Pipeline - Batch Entry Point
+"""
+import sys
+import logging
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+env_path = Path(__file__).parent / ".env"
+if env_path.exists():
+    load_dotenv(env_path)
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from pipeline.batch import (
+    BATCH_ASR_WORKERS,
+    BATCH_FETCH_WORKERS,
+    BATCH_LLM_WORKERS,
+    BATCH_MAX_IN_FLIGHT,
+    BatchRunner,
+    read_video_ids,
+)
+from llm.response_cache import cache_stats_since, get_llm_cache
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    # Check API key before running
+    if not os.getenv("GEMINI_API_KEY"):
+        logger.error(
+            "ERROR: GEMINI_API_KEY not set!\n"
+            "Please set it in .env file or export it as environment variable:\n"
+            "  export GEMINI_API_KEY='your_api_key_here'\n"
+            "Get API key from: https://ai.google.dev/"
+        )
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(
+        description="Summarize many YouTube videos in one process (JSONL output)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python batch.py video_ids.txt -o results.jsonl
+  python batch.py "https://www.youtube.com/playlist?list=PL..." -l Vietnamese
+  python batch.py https://www.youtube.com/@channel --limit 50 --llm-workers 8
+        """
+    )
+    parser.add_argument(
+        "source",
+        help="File with one video ID/URL per line, or a playlist/channel URL"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        help="JSONL output path, one line appended per finished video",
+        default="batch_results.jsonl"
+    )
+    parser.add_argument(
+        "--summary-language", "-l",
+        help="Language for summary output. Defaults to each video's language.",
+        default=None
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Process at most N videos")
+    parser.add_argument("--fetch-workers", type=int, default=BATCH_FETCH_WORKERS, help="Concurrent transcript/metadata fetches")
+    parser.add_argument("--asr-workers", type=int, default=BATCH_ASR_WORKERS, help="Concurrent ASR jobs (videos without captions)")
+    parser.add_argument("--llm-workers", type=int, default=BATCH_LLM_WORKERS, help="Videos summarized concurrently")
+    parser.add_argument("--max-in-flight", type=int, default=BATCH_MAX_IN_FLIGHT, help="Videos held in the pipeline at once")
+    parser.add_argument(
+        "--refresh",
+        help="Recompute every video, ignoring stored results, checkpoints and cached Gemini responses",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        help="Bypass cached Gemini responses (fresh responses are still stored)",
+        action="store_true"
+    )
+
+    args = parser.parse_args()
+
+    video_ids = read_video_ids(args.source, limit=args.limit)
+    if not video_ids:
+        logger.error(f"No video IDs found in: {args.source}")
+        sys.exit(1)
+
+    llm_cache = get_llm_cache()
+    llm_cache.enabled = not args.no_llm_cache
+    cache_before = llm_cache.stats()
+
+    runner = BatchRunner(
+        output_path=args.output,
+        summary_language=args.summary_language,
+        fetch_workers=args.fetch_workers,
+        asr_workers=args.asr_workers,
+        llm_workers=args.llm_workers,
+        max_in_flight=args.max_in_flight,
+        refresh=args.refresh,
+    )
+    summary = runner.run(video_ids)
+
+    cache_stats = cache_stats_since(cache_before)
+    logger.info(f"✓ Batch finished: {summary['ok']}/{summary['videos']} ok, {summary['failed']} failed")
+    logger.info(f"  LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+    logger.info(f"  Results: {args.output}")
+
+    sys.exit(0 if summary["failed"] == 0 else 1)
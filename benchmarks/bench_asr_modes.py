@@ -0,0 +1,58 @@
+"""
+Benchmark: real-time factor (RTF = processing time / audio duration) of
+sequential vs batched faster-whisper inference for several model sizes.
+
+Run:
+  python benchmarks/bench_asr_modes.py audio.opus --models small medium --batch-sizes 8 16
+  python benchmarks/bench_asr_modes.py audio.opus --device cpu --json rtf.json
+"""
+import sys
+import json
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from faster_whisper.audio import decode_audio
+from audio_to_text.whisper_asr import SimpleFasterWhisperASR
+from audio_to_text.model_selection import measure_rtf
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs batched ASR benchmark")
+    parser.add_argument("audio", help="Audio file to transcribe")
+    parser.add_argument("--models", nargs="+", default=["small"])
+    parser.add_argument("--device", default="cuda")
+    parser.add_argument("--compute-type", default=None)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 16])
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    audio_seconds = len(decode_audio(args.audio, sampling_rate=16000)) / 16000
+    print(f"Audio: {args.audio} ({audio_seconds / 60:.1f} min), device: {args.device}\n")
+
+    rows = []
+    for model_size in args.models:
+        modes = [("sequential", None)] + [(f"batched bs={bs}", bs) for bs in args.batch_sizes]
+        for label, batch_size in modes:
+            asr = SimpleFasterWhisperASR(
+                model_size=model_size,
+                device=args.device,
+                compute_type=args.compute_type,
+                batched=batch_size is not None,
+                batch_size=batch_size or 16,
+                beam_size=args.beam_size
+            )
+            row = {"model": model_size, "mode": label, **measure_rtf(asr, args.audio, audio_seconds)}
+            rows.append(row)
+            print(f"{model_size:<10} {label:<16} {row['seconds']:8.1f}s  RTF {row['rtf']:.4f}  ({row['segments']} segments)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"audio_seconds": audio_seconds, "device": args.device, "results": rows}, f, indent=2)
+        print(f"\nSaved: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
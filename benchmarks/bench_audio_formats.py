@@ -0,0 +1,73 @@
+"""
+Benchmark: CPU time and disk bytes per video for each audio download mode.
+
+For every mode the video is downloaded, then decoded to 16 kHz PCM the way
+faster-whisper does it. CPU time covers this process and ffmpeg children.
+
+Run:
+  python benchmarks/bench_audio_formats.py dQw4w9WgXcQ --modes mp3 native wav
+"""
+import sys
+import time
+import argparse
+import resource
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from faster_whisper.audio import decode_audio
+from audio_to_text.ytb_dlp import YTBDlpDownloader, _cpu_seconds
+from fetch_transcript.video_info import extract_video_info
+
+
+def measure(video_id: str, mode: str, video_info, out_dir: str) -> dict:
+    downloader = YTBDlpDownloader(output_dir=out_dir, audio_format=mode)
+    result = downloader.download(video_id, video_info=video_info)
+    if result["status"] != "success":
+        raise RuntimeError(f"{mode}: {result['message']}")
+
+    cpu_start = _cpu_seconds()
+    wall_start = time.perf_counter()
+    decode_audio(result["file_path"], sampling_rate=16000)
+    return {
+        "mode": mode,
+        "bytes": result["file_size"],
+        "download_cpu": result["cpu_seconds"],
+        "decode_cpu": _cpu_seconds() - cpu_start,
+        "decode_wall": time.perf_counter() - wall_start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio download mode benchmark")
+    parser.add_argument("video_id")
+    parser.add_argument("--modes", nargs="+", default=["mp3", "native", "wav"])
+    args = parser.parse_args()
+
+    # Một lần extract cho tất cả các mode
+    video_info = extract_video_info(args.video_id)
+    print(f"Video: {video_info.title} ({(video_info.duration or 0) / 60:.1f} min)\n")
+
+    rows = []
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory() as out_dir:
+            rows.append(measure(args.video_id, mode, video_info, out_dir))
+
+    baseline = next((r for r in rows if r["mode"] == "mp3"), rows[0])
+    base_cpu = baseline["download_cpu"] + baseline["decode_cpu"]
+
+    print(f"{'mode':<8} {'MB':>8} {'dl CPU s':>9} {'decode CPU s':>13} {'total CPU s':>12} {'saved CPU s':>12} {'saved MB':>9}")
+    for r in rows:
+        total = r["download_cpu"] + r["decode_cpu"]
+        print(
+            f"{r['mode']:<8} {r['bytes'] / 1e6:8.2f} {r['download_cpu']:9.2f} "
+            f"{r['decode_cpu']:13.2f} {total:12.2f} {base_cpu - total:12.2f} "
+            f"{(baseline['bytes'] - r['bytes']) / 1e6:9.2f}"
+        )
+    print(f"\n(savings relative to '{baseline['mode']}'; peak RSS "
+          f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: end-to-end latency of run_long_flow in sequential-memory mode vs
+parallel map-reduce mode, against a mocked Gemini client with fixed latency.
+
+Run:
+  python benchmarks/bench_long_flow_modes.py --sections 8 --latency 2.0 --concurrency 4 8
+"""
+import os
+import sys
+import tempfile
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# Cache/checkpoint của benchmark không được lẫn với cache thật
+os.environ["YTB_CACHE_DIR"] = tempfile.mkdtemp()
+
+import pipeline.long_flow as long_flow
+from llm.gemini_client import GeminiClient
+from llm.response_cache import LLMResponseCache
+from pipeline.checkpoint import get_checkpoint_store
+from schemas.output_format import OutlineOutput, SectionOutline
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _MockAsyncModels:
+    """Stands in for genai `client.aio.models` with a fixed latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def generate_content(self, model, contents, config):
+        await asyncio.sleep(self.latency)
+        if "section_takeaways" in json.dumps(config["response_json_schema"]):
+            return _Response(json.dumps({"global_summary": "mock", "section_takeaways": []}))
+        return _Response(json.dumps({"summary": "mock section summary"}))
+
+
+def mock_gemini_client(latency: float) -> GeminiClient:
+    """Real GeminiClient (rate limiter, retries, loop) over a mocked transport."""
+    # Cache riêng, tắt lookup → mỗi mode đều gọi "LLM" thật
+    cache = LLMResponseCache(path=os.path.join(tempfile.mkdtemp(), "llm.sqlite3"), enabled=False)
+    client = GeminiClient(api_key="mock", cache=cache)
+    client.client = SimpleNamespace(aio=SimpleNamespace(models=_MockAsyncModels(latency)))
+    return client
+
+
+def build_inputs(sections: int, seconds_per_section: int = 600):
+    duration = sections * seconds_per_section
+    transcript = " ".join(f"[{t:.2f}s] words spoken at {t} seconds" for t in range(0, duration, 5))
+    outline = OutlineOutput(sections=[
+        SectionOutline(
+            section_id=i + 1,
+            title=f"Section {i + 1}",
+            start=i * seconds_per_section,
+            end=(i + 1) * seconds_per_section,
+            keywords=[f"topic {i + 1}"]
+        )
+        for i in range(sections)
+    ])
+    return transcript, outline, duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-flow mode benchmark (mocked LLM)")
+    parser.add_argument("--sections", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=1.0, help="Mock LLM latency per call (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8])
+    args = parser.parse_args()
+
+    transcript, outline, duration = build_inputs(args.sections)
+    client = mock_gemini_client(args.latency)
+    long_flow.get_gemini_client = lambda: client
+    long_flow.video_segmentation = lambda *a, **k: outline
+
+    runs = [("sequential", 1)] + [("parallel", c) for c in args.concurrency]
+    baseline = None
+    print(f"{args.sections} sections, mock latency {args.latency}s per call\n")
+    for mode, concurrency in runs:
+        start = time.perf_counter()
+        long_flow.run_long_flow(
+            video_id="mock",
+            transcript=transcript,
+            language="English",
+            video_duration=duration,
+            mode=mode,
+            max_concurrency=concurrency,
+            resume=False,
+        )
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        label = mode if mode == "sequential" else f"parallel x{concurrency}"
+        print(f"{label:<14} {elapsed:7.2f}s  ({baseline / elapsed:4.2f}x)")
+
+    # Run thành công không để lại checkpoint
+    assert not get_checkpoint_store().keys("mock|"), "checkpoints left after a successful run"
+
+
+if __name__ == "__main__":
+    main()
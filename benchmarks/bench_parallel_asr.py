@@ -0,0 +1,65 @@
+"""
+Benchmark: single-call CPU transcription vs parallel chunked transcription.
+
+Each worker count is run twice: "cold" includes starting the worker
+processes and loading one model per worker, "warm" reuses the pool kept
+alive across calls (as in production after the first video).
+
+Run:
+  python benchmarks/bench_parallel_asr.py audio.mp3 --model small --workers 2 4 8
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from faster_whisper.audio import decode_audio
+from audio_to_text.whisper_asr import SimpleFasterWhisperASR
+from audio_to_text.parallel_asr import ParallelChunkedASR, SAMPLE_RATE, get_worker_pools
+
+
+def run(label: str, asr, audio_path: str, audio_seconds: float, baseline: float | None):
+    start = time.perf_counter()
+    result = asr.transcribe(audio_path)
+    elapsed = time.perf_counter() - start
+
+    speedup = f"{baseline / elapsed:5.2f}x" if baseline else "  1.00x"
+    print(
+        f"{label:<20} wall {elapsed:8.1f}s | "
+        f"{audio_seconds / elapsed:6.2f} audio-s/s | "
+        f"RTF {elapsed / audio_seconds:6.3f} | {speedup} | "
+        f"{len(result['raw_segments'])} segments"
+    )
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel chunked ASR benchmark")
+    parser.add_argument("audio", help="Audio file to transcribe")
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--max-chunk-seconds", type=float, default=120.0)
+    args = parser.parse_args()
+
+    audio_seconds = len(decode_audio(args.audio, sampling_rate=SAMPLE_RATE)) / SAMPLE_RATE
+    print(f"Audio: {args.audio} ({audio_seconds / 60:.1f} min), model: {args.model}\n")
+
+    # Load model trước để không tính thời gian load vào baseline
+    single = SimpleFasterWhisperASR(model_size=args.model, device="cpu")
+    baseline = run("single call", single, args.audio, audio_seconds, None)
+
+    for workers in args.workers:
+        parallel = ParallelChunkedASR(
+            model_size=args.model,
+            workers=workers,
+            max_chunk_seconds=args.max_chunk_seconds
+        )
+        run(f"parallel x{workers} cold", parallel, args.audio, audio_seconds, baseline)
+        run(f"parallel x{workers} warm", parallel, args.audio, audio_seconds, baseline)
+        get_worker_pools().shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Result store latency: `main.main()` for a video whose summary is already
+stored, vs. the raw store lookup. A hit must not fetch anything: the
+fetch node is replaced by one that raises, so any network access fails
+the run.
+
+Uses a temporary YTB_CACHE_DIR, so your real caches are untouched.
+
+Run:
+  python benchmarks/bench_result_store.py --sections 12 --repeat 50
+"""
+import os
+import sys
+import time
+import tempfile
+import argparse
+import statistics
+from pathlib import Path
+
+os.environ["YTB_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_results_")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import main as entry_point
+from pipeline.result_store import ResultStore, get_result_store
+from schemas.output_format import GlobalSummaryOutput, SectionTakeaway
+
+
+class NoNetworkNode:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def run(self, video_id):
+        raise AssertionError(f"result store miss: pipeline ran for {video_id}")
+
+
+def build_result(sections: int) -> GlobalSummaryOutput:
+    return GlobalSummaryOutput(
+        global_summary="Tổng quan video. " * 80,
+        section_takeaways=[
+            SectionTakeaway(
+                section_id=i + 1,
+                title=f"Phần {i + 1}",
+                start=i * 60.0,
+                end=(i + 1) * 60.0,
+                takeaways=[f"Ý chính {j + 1} của phần {i + 1}: " + "nội dung " * 20 for j in range(4)],
+            )
+            for i in range(sections)
+        ],
+    )
+
+
+def timings_ms(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Result store hit latency")
+    parser.add_argument("--sections", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    video_id, language = "benchVideo1", "Vietnamese"
+    result = build_result(args.sections)
+    store = get_result_store()
+    store.put(video_id, language, result)
+
+    # Hit trả về đúng kết quả đã lưu; version khác → miss
+    assert store.get(video_id, language).result == result
+    assert ResultStore(pipeline_version="other").get(video_id, language) is None
+
+    output_file = os.path.join(os.environ["YTB_CACHE_DIR"], "out.json")
+    entry_point.VideoToTextNode = NoNetworkNode
+    lookup = timings_ms(lambda: store.get(video_id, language), args.repeat)
+    end_to_end = timings_ms(
+        lambda: entry_point.main(video_id, output_file=output_file, summary_language=language),
+        args.repeat,
+    )
+    assert entry_point.main(video_id, output_file=output_file, summary_language=language) == result
+
+    size = len(store.store.get(store._key(video_id, language)))
+    print(f"{args.sections} sections, {size / 1024:.1f} KB stored (zlib JSON)")
+    for name, samples in (("store.get", lookup), ("main() hit", end_to_end)):
+        print(
+            f"  {name:<11} median {statistics.median(samples):6.2f} ms, "
+            f"max {max(samples):6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
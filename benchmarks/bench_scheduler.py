@@ -0,0 +1,247 @@
+"""
+Benchmark: thread-per-request (each request holds its thread through fetch,
+ASR and LLM; ASR serialized by one GPU lock) vs. StageScheduler hand-off
+(fetch / ASR / LLM on separate bounded pools).
+
+Stages are simulated with sleeps, so this measures scheduling only: a mix
+of captioned videos (fetch → LLM) and caption-less ones (fetch → ASR → LLM).
+A final burst checks single-flight coalescing: concurrent requests for one
+video share its fetch / ASR, and one summary is produced per language.
+Streaming ASR is checked too: decoding that continues on LLM threads must
+still hold the ASR slot, and the real VideoToTextNode.transcribe (transcript
+cache on, ASR mocked) must stream through the scheduler and cache the result.
+
+Run:
+  python benchmarks/bench_scheduler.py --requests 24 --asr-ratio 0.25 --workers 4
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from types import SimpleNamespace
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pipeline.scheduler import StageScheduler, VideoJob
+from pipeline.router import VideoToTextNode
+from fetch_transcript.transcript_cache import TranscriptCache
+from fetch_transcript.youtube_fetcher import FetchResult, FetchStatus
+
+
+@dataclass
+class SimulatedTranscript:
+    ok: bool
+    error: str | None = None
+    segment_stream: object = None
+
+
+class SimulatedNode:
+    def __init__(self, fetch_seconds: float, asr_seconds: float, caption_less: set, gpu: threading.Lock):
+        self.fetch_seconds = fetch_seconds
+        self.asr_seconds = asr_seconds
+        self.caption_less = caption_less
+        self.gpu = gpu
+        self.calls = Counter()
+
+    def fetch(self, video_id):
+        self.calls["fetch"] += 1
+        time.sleep(self.fetch_seconds)
+        return SimulatedTranscript(ok=video_id not in self.caption_less)
+
+    def transcribe(self, video_id, fetch_result):
+        self.calls["asr"] += 1
+        with self.gpu:  # một GPU: ASR không chạy song song được
+            time.sleep(self.asr_seconds)
+        return SimulatedTranscript(ok=True)
+
+    def run(self, video_id):
+        result = self.fetch(video_id)
+        return result if result.ok else self.transcribe(video_id, result)
+
+
+class StreamingNode(SimulatedNode):
+    """ASR returns at once; segments are decoded while the caller iterates (ASR_STREAMING=1)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._decoding = 0
+        self.max_decoding = 0
+        self._lock = threading.Lock()
+
+    def _decode(self, segments: int):
+        with self._lock:
+            self._decoding += 1
+            self.max_decoding = max(self.max_decoding, self._decoding)
+        try:
+            for i in range(segments):
+                time.sleep(self.asr_seconds / segments)
+                yield i
+        finally:
+            with self._lock:
+                self._decoding -= 1
+
+    def transcribe(self, video_id, fetch_result):
+        self.calls["asr"] += 1
+        return SimulatedTranscript(ok=True, segment_stream=self._decode(4))
+
+
+class SimulatedRouter:
+    def __init__(self, llm_seconds: float):
+        self.llm_seconds = llm_seconds
+
+        self.calls = Counter()
+
+    def route(self, video_id, transcript, summary_language=None, refresh=False):
+        self.calls["llm"] += 1
+        for _ in transcript.segment_stream or ():
+            pass
+        time.sleep(self.llm_seconds)
+        return {"video_id": video_id}
+
+
+def thread_per_request(video_ids, node, router, workers: int) -> float:
+    def handle(video_id):
+        transcript = node.run(video_id)
+        return router.route(video_id, transcript)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(handle, video_ids))
+    return time.perf_counter() - start
+
+
+def staged(video_ids, node, router, workers: int) -> tuple[float, dict]:
+    scheduler = StageScheduler(fetch_slots=workers, asr_slots=1, llm_slots=workers)
+    start = time.perf_counter()
+    submitted = [scheduler.submit(VideoJob(video_id), node, router) for video_id in video_ids]
+    jobs = [job.future.result() for job in submitted]
+    elapsed = time.perf_counter() - start
+    assert all(job.ok for job in jobs), [job.error for job in jobs if not job.ok]
+    scheduler.shutdown()
+    return elapsed, scheduler.stats()
+
+
+def coalescing_burst(node, router, languages: list) -> dict:
+    """Same caption-less video requested by several users at once, in a mix of languages."""
+    scheduler = StageScheduler()
+    node.calls.clear()
+    router.calls.clear()
+    submitted = [scheduler.submit(VideoJob("shared", summary_language=lang), node, router) for lang in languages]
+    jobs = [job.future.result() for job in submitted]
+    scheduler.shutdown()
+    assert all(job.ok for job in jobs), [job.error for job in jobs if not job.ok]
+    return {"requests": len(languages), **node.calls, **router.calls, "distinct_jobs": len({id(job) for job in jobs})}
+
+
+def streaming_asr(node: StreamingNode, router, videos: int) -> int:
+    """Caption-less videos with streaming ASR; returns the peak number of concurrent decoders."""
+    scheduler = StageScheduler(fetch_slots=videos, asr_slots=1, llm_slots=videos)
+    submitted = [scheduler.submit(VideoJob(f"stream{i}"), node, router) for i in range(videos)]
+    jobs = [job.future.result() for job in submitted]
+    scheduler.shutdown()
+    assert all(job.ok for job in jobs), [job.error for job in jobs if not job.ok]
+    return node.max_decoding
+
+
+class OfflineNode(VideoToTextNode):
+    """Real VideoToTextNode (transcribe, transcript cache); fetch fails without network."""
+
+    def fetch(self, video_id):
+        return FetchResult(ok=False, status=FetchStatus.NOT_FOUND, error="no captions")
+
+
+def mocked_streaming_asr(video_id, video_info=None, stream=False):
+    """Stands in for ytb_video_to_transcript(stream=True): payload now, segments lazily."""
+    result = FetchResult(
+        ok=True,
+        status=FetchStatus.SUCCESS,
+        transcript={
+            "video_id": video_id, "language": "en", "language_code": "en", "is_generated": False,
+            "duration": {"seconds": 40.0, "minutes": 0.67}, "text": "", "source": "ASR",
+        },
+    )
+
+    def segments():
+        for i in range(4):
+            time.sleep(0.01)
+            yield SimpleNamespace(start=i * 10.0, end=(i + 1) * 10.0, text=f"segment {i}")
+        result.segments = [{"text": f"segment {i}", "start": i * 10.0, "duration": 10.0} for i in range(4)]
+
+    result.segment_stream = segments()
+    return result
+
+
+def real_node_streaming(router) -> dict:
+    """Streaming ASR through the scheduler with the real VideoToTextNode and transcript cache."""
+    cache = TranscriptCache(path=os.path.join(tempfile.mkdtemp(), "transcripts.sqlite3"))
+    node = OfflineNode(cache=cache, stream_asr=True)
+    scheduler = StageScheduler()
+    with mock.patch("pipeline.audio_summary.ytb_video_to_transcript", mocked_streaming_asr):
+        job = scheduler.submit(VideoJob("streamed"), node, router).future.result()
+    scheduler.shutdown()
+    assert job.ok, job.error
+    cached = cache.get("streamed", "en", False)
+    assert cached is not None and len(cached["segments"]) == 4, cached
+    return {"segments": len(cached["segments"])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage scheduler benchmark (simulated stages)")
+    parser.add_argument("--requests", type=int, default=24)
+    parser.add_argument("--asr-ratio", type=float, default=0.25, help="Share of videos without captions")
+    parser.add_argument("--workers", type=int, default=4, help="Request threads / fetch + LLM slots")
+    parser.add_argument("--fetch", type=float, default=0.05)
+    parser.add_argument("--asr", type=float, default=0.4)
+    parser.add_argument("--llm", type=float, default=0.3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    video_ids = [f"video{i:03d}" for i in range(args.requests)]
+    caption_less = set(rng.sample(video_ids, round(args.requests * args.asr_ratio)))
+    node = SimulatedNode(args.fetch, args.asr, caption_less, threading.Lock())
+    router = SimulatedRouter(args.llm)
+
+    print(f"{args.requests} requests, {len(caption_less)} need ASR, {args.workers} workers")
+    baseline = thread_per_request(video_ids, node, router, args.workers)
+    elapsed, stats = staged(video_ids, node, router, args.workers)
+    print(f"  thread-per-request: {baseline:.2f}s")
+    print(f"  stage scheduler:    {elapsed:.2f}s ({baseline / elapsed:.2f}x)")
+    for name, s in stats.items():
+        print(
+            f"  {name:>5}: {s['completed']:>3} tasks, {s['slots']} slots, "
+            f"wait avg {s['avg_wait_seconds']:.3f}s / max {s['max_wait_seconds']:.3f}s"
+        )
+
+    # Single-flight: 6 requests, 3 languages → 1 fetch, 1 ASR, 3 summaries
+    node.caption_less.add("shared")
+    languages = ["Vietnamese", "English", "Vietnamese", None, "English", None]
+    calls = coalescing_burst(node, router, languages)
+    expected = len(set(languages))
+    print(
+        f"\n  burst of {calls['requests']} requests ({expected} languages): "
+        f"{calls['fetch']} fetch, {calls['asr']} ASR, {calls['llm']} LLM, {calls['distinct_jobs']} jobs"
+    )
+    assert calls["fetch"] == 1 and calls["asr"] == 1, calls
+    assert calls["llm"] == expected and calls["distinct_jobs"] == expected, calls
+
+    # Streaming ASR: 1 ASR slot → không bao giờ 2 video decode cùng lúc
+    streaming = StreamingNode(args.fetch, args.asr, {f"stream{i}" for i in range(4)}, threading.Lock())
+    peak = streaming_asr(streaming, router, videos=4)
+    print(f"  streaming ASR, 4 videos / 1 slot: peak {peak} concurrent decoder(s)")
+    assert peak == 1, peak
+
+    # Real VideoToTextNode.transcribe: stream wrapper của cache + wrapper slot ASR của scheduler
+    streamed = real_node_streaming(router)
+    print(f"  real VideoToTextNode streaming ASR: ok, {streamed['segments']} segments cached")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark: TranscriptSegmenter.segment_by_outline, linear rescan
+(previous implementation, kept below as reference) vs. sorted arrays +
+binary search over one text buffer. Outputs are checked to be identical.
+
+Run:
+  python benchmarks/bench_segmenter.py --sizes 1000 10000 100000 --sections 10
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from preprocess.segmenter import TranscriptSegmenter
+from schemas.output_format import SectionOutline
+
+
+def legacy_segment_by_outline(segments, outline):
+    sections = []
+    for sec in outline:
+        texts = []
+        for seg in segments:
+            if seg["end"] is not None and seg["end"] <= sec.start:
+                continue
+            if seg["start"] >= sec.end:
+                break
+            texts.append(seg["text"])
+        sections.append({
+            "section_id": sec.section_id,
+            "title": sec.title,
+            "start": sec.start,
+            "end": sec.end,
+            "text": " ".join(texts).strip()
+        })
+    return sections
+
+
+def build_transcript(n_segments: int, seed: int = 0) -> tuple[str, float]:
+    rng = random.Random(seed)
+    words = "the quick brown fox jumps over lazy dog while we talk about code".split()
+    parts, t = [], 0.0
+    for _ in range(n_segments):
+        parts.append(f"[{t:.2f}s] " + " ".join(rng.choices(words, k=rng.randint(3, 12))))
+        t += rng.uniform(1.0, 5.0)
+    return " ".join(parts), t
+
+
+def build_outline(duration: float, sections: int) -> list:
+    step = duration / sections
+    return [
+        SectionOutline(section_id=i + 1, title=f"Part {i + 1}", start=i * step, end=(i + 1) * step, keywords=[])
+        for i in range(sections)
+    ]
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcript segmenter micro-benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--sections", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'segments':>9} {'parse':>9} {'legacy':>10} {'bisect':>10} {'speedup':>8}")
+    for size in args.sizes:
+        transcript, duration = build_transcript(size)
+        outline = build_outline(duration, args.sections)
+
+        parse = best_of(lambda: TranscriptSegmenter(transcript), args.repeat)
+        segmenter = TranscriptSegmenter(transcript)
+        segments = segmenter.segments
+
+        expected = legacy_segment_by_outline(segments, outline)
+        assert segmenter.segment_by_outline(outline) == expected, f"output mismatch at {size} segments"
+
+        legacy = best_of(lambda: legacy_segment_by_outline(segments, outline), args.repeat)
+        indexed = best_of(lambda: segmenter.segment_by_outline(outline), args.repeat)
+        print(f"{size:>9} {parse * 1000:>7.1f}ms {legacy * 1000:>8.2f}ms {indexed * 1000:>8.3f}ms {legacy / indexed:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
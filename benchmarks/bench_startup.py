@@ -0,0 +1,88 @@
+"""
+Startup benchmark for the captioned-video path.
+
+Each measurement runs in a fresh interpreter and reports time to the first
+log line (import main.py → logger.info) and peak RSS. With --video-id the
+child also fetches the YouTube transcript (no ASR, no LLM) and reports which
+heavy modules got loaded along the way; loading torch / faster_whisper on
+that path fails the run. The import check itself is tests/test_lazy_imports.py.
+
+Run:
+  python benchmarks/bench_startup.py
+  python benchmarks/bench_startup.py --video-id dQw4w9WgXcQ --runs 3
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+HEAVY_MODULES = ["torch", "faster_whisper", "yt_dlp", "google.genai", "gradio"]
+# Không được load trên đường video có caption
+FORBIDDEN_ON_IMPORT = ["torch", "faster_whisper"]
+
+CAPTIONED_PATH = """
+import sys, json, time, resource
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+sys.argv = ["main.py"]
+import main
+main.logger.info("first log line")
+first_log = time.perf_counter() - start
+
+video_id = {video_id!r}
+fetched = None
+if video_id:
+    result = main.VideoToTextNode().run(video_id)
+    fetched = time.perf_counter() - start
+    if not result.ok:
+        raise SystemExit(f"transcript fetch failed: {{result.error}}")
+
+print(json.dumps({{
+    "first_log_seconds": first_log,
+    "fetch_seconds": fetched,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_child(code: str) -> str:
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr.strip() or proc.stdout.strip())
+    return proc.stdout.strip().splitlines()[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Captioned-path startup benchmark")
+    parser.add_argument("--video-id", default=None, help="Also fetch this video's YouTube transcript")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    ok = True
+    print(f"{'run':>4} {'first log':>10} {'fetch':>8} {'peak RSS':>10}  loaded")
+    for i in range(args.runs):
+        stats = json.loads(run_child(CAPTIONED_PATH.format(root=str(ROOT), video_id=args.video_id, heavy=HEAVY_MODULES)))
+        fetch = f"{stats['fetch_seconds']:.2f}s" if stats["fetch_seconds"] is not None else "-"
+        print(
+            f"{i + 1:>4} {stats['first_log_seconds']:>9.2f}s {fetch:>8} "
+            f"{stats['peak_rss_mb']:>7.0f} MB  {', '.join(stats['loaded']) or '-'}"
+        )
+        if any(m in stats["loaded"] for m in FORBIDDEN_ON_IMPORT):
+            print("      ↳ captioned path loaded ASR dependencies")
+            ok = False
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+ASR calibration - measure Whisper real-time factors on this machine.
+The results feed the duration/deadline-aware model selection.
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from audio_to_text.model_selection import ASR_MODES, CALIBRATION_PATH, MODEL_SIZES, calibrate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure Whisper real-time factors for ASR model selection",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python calibrate_asr.py sample.opus
+  python calibrate_asr.py sample.opus --device cpu --models tiny base small
+  python calibrate_asr.py sample.opus --mode batched --batch-size 16
+  python calibrate_asr.py sample.opus --device cpu --mode parallel --workers 4
+        """
+    )
+    parser.add_argument("audio", help="Representative audio file (a few minutes of speech)")
+    parser.add_argument("--models", nargs="+", default=MODEL_SIZES, help="Model sizes to measure")
+    parser.add_argument("--device", default="cuda", help="cuda or cpu")
+    parser.add_argument("--compute-type", default=None, help="Defaults to float16 (cuda) / int8 (cpu)")
+    parser.add_argument("--mode", choices=ASR_MODES, default="single", help="ASR path to measure (match ASR_BATCHED / ASR_CPU_WORKERS)")
+    parser.add_argument("--batch-size", type=int, default=16, help="Batched mode: ASR_BATCH_SIZE")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel mode: ASR_CPU_WORKERS")
+    parser.add_argument("--output", "-o", default=CALIBRATION_PATH, help="Calibration table path")
+    args = parser.parse_args()
+
+    calibrate(
+        audio_path=args.audio,
+        model_sizes=args.models,
+        device=args.device,
+        compute_type=args.compute_type,
+        path=args.output,
+        mode=args.mode,
+        batch_size=args.batch_size,
+        workers=args.workers,
+    )
+    print(f"\nSaved calibration table: {args.output}")
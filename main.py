@@ -17,6 +17,8 @@ if env_path.exists():
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from pipeline.router import TranscriptRouter, VideoToTextNode
+from pipeline.result_store import get_result_store
+from llm.response_cache import cache_stats_since, get_llm_cache
 
 # Configure logging
 logging.basicConfig(
@@ -26,23 +28,51 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main(video_id: str, output_file: str = None, summary_language: str = None):
+def write_output(result, output_file: str = None):
+    output_dict = result.model_dump()
+    
+    if output_file:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(output_dict, f, indent=2, ensure_ascii=False)
+        logger.info(f"✓ Results saved to: {output_file}")
+    else:
+        print("\n" + "="*80)
+        print("SUMMARIZATION RESULTS")
+        print("="*80)
+        print(json.dumps(output_dict, indent=2, ensure_ascii=False))
+
+
+def main(video_id: str, output_file: str = None, summary_language: str = None, stream_asr: bool = False, use_llm_cache: bool = True, refresh: bool = False, resume: bool = True):
     """
-    Main pipeline: Fetch transcript → Route → Summarize
+    Main pipeline: Result store → Fetch transcript → Route → Summarize
     
     Args:
         video_id: YouTube video ID
         output_file: Optional output file path for results (JSON)
         summary_language: Language for summary output (defaults to video language)
+        stream_asr: Summarize sections while ASR is still transcribing (videos without captions)
+        use_llm_cache: Reuse cached Gemini responses (False still stores fresh ones)
+        refresh: Recompute the summary, ignoring the stored result, checkpoints and
+            cached LLM responses (the new one replaces the stored result)
+        resume: Reuse long-flow checkpoints left by a failed run
     """
     try:
         logger.info(f"Starting pipeline for video: {video_id}")
         if summary_language:
             logger.info(f"Summary language: {summary_language}")
         
+        # Step 0: Stored result for this video / language / pipeline version
+        result_store = get_result_store()
+        if not refresh:
+            stored = result_store.get(video_id, summary_language)
+            if stored is not None:
+                logger.info(f"✓ Result store hit (saved {stored.age_seconds / 3600:.1f}h ago, use --refresh to recompute)")
+                write_output(stored.result, output_file)
+                return stored.result
+        
         # Step 1: Fetch transcript (YouTube or ASR)
         logger.info("Step 1: Fetching transcript...")
-        video_to_text_node = VideoToTextNode()
+        video_to_text_node = VideoToTextNode(stream_asr=stream_asr)
         transcript = video_to_text_node.run(video_id)
         
         if not transcript.ok:
@@ -53,26 +83,33 @@ def main(video_id: str, output_file: str = None, summary_language: str = None):
         logger.info(f"  Language: {transcript.transcript['language']}")
         logger.info(f"  Duration: {transcript.transcript['duration']['minutes']:.2f} minutes")
         logger.info(f"  Source: {transcript.transcript.get('source', 'YouTube')}")
+        if transcript.timings:
+            logger.info(
+                f"  Fetch timing: wall {transcript.timings['wall_seconds']:.2f}s, "
+                f"saved {transcript.timings['saved_seconds']:.2f}s by running "
+                f"transcript + metadata concurrently"
+            )
         
         # Step 2: Route & Summarize (short or long flow)
         logger.info("Step 2: Routing and summarizing...")
+        llm_cache = get_llm_cache()
+        llm_cache.enabled = use_llm_cache
+        cache_before = llm_cache.stats()
         transcription_router = TranscriptRouter()
-        result = transcription_router.route(video_id, transcript, summary_language=summary_language)
+        result = transcription_router.route(
+            video_id, transcript,
+            summary_language=summary_language,
+            resume=resume,
+            refresh=refresh,
+        )
         
         logger.info(f"✓ Summarization completed")
+        cache_stats = cache_stats_since(cache_before)
+        logger.info(f"  LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
         
-        # Step 3: Output results
-        output_dict = result.model_dump()
-        
-        if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(output_dict, f, indent=2, ensure_ascii=False)
-            logger.info(f"✓ Results saved to: {output_file}")
-        else:
-            print("\n" + "="*80)
-            print("SUMMARIZATION RESULTS")
-            print("="*80)
-            print(json.dumps(output_dict, indent=2, ensure_ascii=False))
+        # Step 3: Store and output results
+        result_store.put(video_id, summary_language, result, transcript)
+        write_output(result, output_file)
         
         return result
         
@@ -103,6 +140,7 @@ Examples:
   python main.py dQw4w9WgXcQ --output result.json
   python main.py dQw4w9WgXcQ --summary-language Vietnamese
   python main.py dQw4w9WgXcQ -o result.json -l en
+  python main.py dQw4w9WgXcQ --refresh
         """
     )
     parser.add_argument(
@@ -119,13 +157,37 @@ Examples:
         help="Language for summary output (e.g., Vietnamese, English). Defaults to video language.",
         default=None
     )
+    parser.add_argument(
+        "--stream-asr",
+        help="For videos without captions, summarize sections while ASR is still running",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        help="Bypass cached Gemini responses (fresh responses are still stored)",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--refresh",
+        help="Recompute the summary, ignoring stored results, checkpoints and cached Gemini responses",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--no-resume",
+        help="Discard long-flow checkpoints from a failed run and start over",
+        action="store_true"
+    )
     
     args = parser.parse_args()
     
     result = main(
         video_id=args.video_id,
         output_file=args.output,
-        summary_language=args.summary_language
+        summary_language=args.summary_language,
+        stream_asr=args.stream_asr,
+        use_llm_cache=not args.no_llm_cache,
+        refresh=args.refresh,
+        resume=not args.no_resume
     )
     
     sys.exit(0 if result else 1)
@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", 5 * 1024 ** 3))
+MANIFEST_NAME = "manifest.json"
+
+# Một lock cho mỗi cache_dir, dùng chung giữa mọi AudioCache trong process
+# (mỗi YTBDlpDownloader tạo cache riêng nhưng cùng một manifest)
+_dir_locks: Dict[str, threading.Lock] = {}
+_dir_locks_guard = threading.Lock()
+
+
+def _lock_for(cache_dir: str) -> threading.Lock:
+    key = os.path.realpath(cache_dir)
+    with _dir_locks_guard:
+        return _dir_locks.setdefault(key, threading.Lock())
+
+
+class AudioCache:
+    """
+    Downloaded audio stored as `<cache_dir>/<video_id>.<ext>`.
+
+    `manifest.json` records per video: file name, format, duration, size and
+    last access. Total size is kept under `max_bytes` by evicting the least
+    recently used files.
+
+    Instances pointing at the same directory share one lock, so concurrent
+    downloaders never lose manifest updates.
+    """
+
+    def __init__(self, cache_dir: str = "audio_downloads", max_bytes: Optional[int] = AUDIO_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+        self._lock = _lock_for(cache_dir)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # -----------------------
+    # Manifest I/O
+    # -----------------------
+    def _load(self) -> Dict:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save(self, manifest: Dict):
+        # Ghi file tạm (tên riêng) rồi replace → không bao giờ để manifest hỏng giữa chừng
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=MANIFEST_NAME + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    # -----------------------
+    # Public API
+    # -----------------------
+    def path_template(self, video_id: str) -> str:
+        """yt-dlp outtmpl for a video."""
+        return os.path.join(self.cache_dir, f"{video_id}.%(ext)s")
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        """Return the manifest entry (with absolute `file_path`) or None."""
+        with self._lock:
+            manifest = self._load()
+            entry = manifest.get(video_id)
+            if entry is None:
+                return None
+
+            file_path = os.path.join(self.cache_dir, entry["file"])
+            if not os.path.exists(file_path):
+                # File bị xoá bên ngoài → bỏ entry
+                del manifest[video_id]
+                self._save(manifest)
+                return None
+
+            entry["last_access"] = time.time()
+            self._save(manifest)
+            return {**entry, "file_path": file_path}
+
+    def put(self, video_id: str, file_path: str, audio_format: str, duration: Optional[float] = None, title: Optional[str] = None) -> Dict:
+        with self._lock:
+            manifest = self._load()
+            entry = {
+                "file": os.path.basename(file_path),
+                "format": audio_format,
+                "duration": duration,
+                "title": title,
+                "size": os.path.getsize(file_path),
+                "last_access": time.time(),
+            }
+            manifest[video_id] = entry
+            self._evict(manifest, keep=video_id)
+            self._save(manifest)
+            return {**entry, "file_path": file_path}
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(e["size"] for e in self._load().values())
+
+    def _evict(self, manifest: Dict, keep: str):
+        if self.max_bytes is None:
+            return
+        total = sum(e["size"] for e in manifest.values())
+        by_age = sorted(manifest.items(), key=lambda item: item[1]["last_access"])
+        for video_id, entry in by_age:
+            if total <= self.max_bytes:
+                break
+            if video_id == keep:
+                continue
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except FileNotFoundError:
+                pass
+            total -= entry["size"]
+            del manifest[video_id]
@@ -0,0 +1,248 @@
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import numpy as np
+from faster_whisper import WhisperModel
+
+
+WHISPER_IDLE_TIMEOUT_SECONDS = float(os.getenv("WHISPER_IDLE_TIMEOUT_SECONDS", 900))
+WHISPER_MEMORY_BUDGET_MB = float(os.getenv("WHISPER_MEMORY_BUDGET_MB", 6000))
+
+# Ước lượng bộ nhớ (MB) của model ở float16/float32; int8 ≈ một nửa
+MODEL_MEMORY_MB = {
+    "tiny": 150,
+    "base": 300,
+    "small": 1000,
+    "medium": 2600,
+    "large-v1": 4800,
+    "large-v2": 4800,
+    "large-v3": 4800,
+    "large-v3-turbo": 2600,
+    "turbo": 2600,
+    "distil-large-v3": 2600,
+}
+
+
+def resolve_compute_type(device: str, compute_type: str | None) -> str:
+    """float16 for CUDA, int8 for CPU unless given explicitly."""
+    if compute_type is not None:
+        return compute_type
+    return "float16" if device == "cuda" else "int8"
+
+
+def estimate_model_memory_mb(model_size: str, compute_type: str) -> float:
+    size_mb = MODEL_MEMORY_MB.get(model_size, MODEL_MEMORY_MB["large-v3"])
+    if compute_type.startswith("int8"):
+        size_mb /= 2
+    return size_mb
+
+
+@dataclass
+class _Entry:
+    model: WhisperModel
+    memory_mb: float
+    # Số transcription đang dùng model → không bị unload giữa chừng
+    active: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class WhisperModelRegistry:
+    """
+    Process-wide cache of loaded WhisperModel objects keyed by
+    (model_size, device, compute_type).
+
+    - Models are loaded lazily on first `get` / `lease`.
+    - A leased model (decoding in progress) is never unloaded.
+    - Models unused for `idle_timeout` seconds are unloaded.
+    - The sum of estimated model sizes stays under `memory_budget_mb`
+      by evicting the least recently used idle models; when every loaded
+      model is leased, a new load waits for a lease to end.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float | None = WHISPER_IDLE_TIMEOUT_SECONDS,
+        memory_budget_mb: float | None = WHISPER_MEMORY_BUDGET_MB,
+    ):
+        self.idle_timeout = idle_timeout
+        self.memory_budget_mb = memory_budget_mb
+        self._models: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        # Báo khi một lease kết thúc (cho _make_room đang đợi)
+        self._released = threading.Condition(self._lock)
+        self._load_locks: dict[tuple, threading.Lock] = {}
+        self._reaper: threading.Thread | None = None
+
+    # -----------------------
+    # Public API
+    # -----------------------
+    def get(self, model_size: str = "small", device: str = "cuda", compute_type: str | None = None) -> WhisperModel:
+        """Load (or reuse) a model without leasing it, e.g. to preload it."""
+        return self._get((model_size, device, resolve_compute_type(device, compute_type)), lease=False)
+
+    def acquire(self, model_size: str = "small", device: str = "cuda", compute_type: str | None = None) -> tuple[tuple, WhisperModel]:
+        """Lease a model; returns (key, model). Pair with `release(key)`."""
+        key = (model_size, device, resolve_compute_type(device, compute_type))
+        return key, self._get(key, lease=True)
+
+    def release(self, key: tuple):
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                entry.active -= 1
+                entry.last_used = time.monotonic()
+            self._released.notify_all()
+
+    @contextmanager
+    def lease(self, model_size: str = "small", device: str = "cuda", compute_type: str | None = None):
+        """Model for the duration of the block; never evicted while leased."""
+        key, model = self.acquire(model_size, device, compute_type)
+        try:
+            yield model
+        finally:
+            self.release(key)
+
+    def _get(self, key: tuple, lease: bool) -> WhisperModel:
+        model_size, device, compute_type = key
+        model = self._touch(key, lease)
+        if model is not None:
+            return model
+
+        # Một lock riêng cho mỗi key → 2 request cùng lúc không load 2 lần
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            model = self._touch(key, lease)
+            if model is not None:
+                return model
+
+            memory_mb = estimate_model_memory_mb(model_size, compute_type)
+            self._make_room(memory_mb)
+
+            print(f"[WhisperModelRegistry] Loading {model_size} ({device}, {compute_type})")
+            model = WhisperModel(model_size, device=device, compute_type=compute_type)
+
+            with self._lock:
+                self._models[key] = _Entry(model=model, memory_mb=memory_mb, active=int(lease))
+            self._ensure_reaper()
+            return model
+
+    def warmup(self, model_size: str = "small", device: str = "cuda", compute_type: str | None = None):
+        """Load the model and run one tiny decode so the first request is fast."""
+        model = self.get(model_size, device, compute_type)
+        silence = np.zeros(16000, dtype=np.float32)
+        segments, _ = model.transcribe(silence, language="en", beam_size=1)
+        list(segments)
+
+    def evict(self, key: tuple, only_idle: bool = False):
+        with self._lock:
+            entry = self._models.get(key)
+            # only_idle: kiểm tra lại dưới lock, model có thể vừa được lease
+            if entry is None or (only_idle and entry.active):
+                return
+            del self._models[key]
+        if entry is not None:
+            print(f"[WhisperModelRegistry] Unloading {key[0]} ({key[1]}, {key[2]})")
+            self._release(entry, key[1])
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._models)
+        for key in keys:
+            self.evict(key)
+
+    def loaded(self) -> list[tuple]:
+        with self._lock:
+            return list(self._models)
+
+    # -----------------------
+    # Internals
+    # -----------------------
+    def _touch(self, key: tuple, lease: bool = False) -> WhisperModel | None:
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                return None
+            entry.active += int(lease)
+            entry.last_used = time.monotonic()
+            self._models.move_to_end(key)
+            return entry.model
+
+    def _make_room(self, memory_mb: float):
+        if self.memory_budget_mb is None:
+            return
+        while True:
+            with self._lock:
+                used = sum(e.memory_mb for e in self._models.values())
+                if not self._models or used + memory_mb <= self.memory_budget_mb:
+                    return
+                idle = [key for key, entry in self._models.items() if not entry.active]
+                if not idle:
+                    # Mọi model đang decode → đợi một lease kết thúc, không load bản thứ hai vượt budget
+                    print("[WhisperModelRegistry] Memory budget full, waiting for a model to be released")
+                    self._released.wait()
+                    continue
+                lru_key = idle[0]
+            self.evict(lru_key, only_idle=True)
+
+    def _evict_idle(self):
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                key for key, entry in self._models.items()
+                if not entry.active and now - entry.last_used > self.idle_timeout
+            ]
+        for key in idle:
+            self.evict(key, only_idle=True)
+
+    def _ensure_reaper(self):
+        if self.idle_timeout is None:
+            return
+        with self._lock:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(
+                target=self._reap_loop,
+                name="whisper-model-reaper",
+                daemon=True
+            )
+            self._reaper.start()
+
+    def _reap_loop(self):
+        interval = max(1.0, min(60.0, self.idle_timeout / 4))
+        while True:
+            time.sleep(interval)
+            self._evict_idle()
+            with self._lock:
+                if not self._models:
+                    self._reaper = None
+                    return
+
+    @staticmethod
+    def _release(entry: _Entry, device: str):
+        del entry.model
+        gc.collect()
+        if device == "cuda":
+            import torch
+            torch.cuda.empty_cache()
+
+
+_registry: WhisperModelRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> WhisperModelRegistry:
+    """Process-wide model registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = WhisperModelRegistry()
+        return _registry
@@ -0,0 +1,175 @@
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from faster_whisper.audio import decode_audio
+
+from audio_to_text.model_registry import get_model_registry, resolve_compute_type
+from audio_to_text.parallel_asr import ParallelChunkedASR, get_worker_pools
+from audio_to_text.whisper_asr import SimpleFasterWhisperASR
+from utils.sqlite_cache import CACHE_DIR
+
+
+# Đo trên từng máy → nằm trong cache/ (được mount trong Docker), không trong source
+CALIBRATION_PATH = os.getenv(
+    "ASR_CALIBRATION_PATH",
+    os.path.join(CACHE_DIR, "asr_calibration.json")
+)
+# Deadline mặc định cho bước ASR (giây)
+ASR_TARGET_LATENCY_SECONDS = float(os.getenv("ASR_TARGET_LATENCY_SECONDS", 300))
+
+# Từ nhỏ → lớn (chất lượng tăng dần)
+MODEL_SIZES = ["tiny", "base", "small", "medium", "large-v3-turbo", "large-v3"]
+# Cách chạy ASR, RTF khác nhau nhiều giữa các mode:
+# "single" (một model, decode tuần tự), "batched" (BatchedInferencePipeline, GPU),
+# "parallel" (ParallelChunkedASR, nhiều process CPU)
+ASR_MODES = ["single", "batched", "parallel"]
+
+
+@dataclass
+class ModelChoice:
+    model_size: str
+    device: str
+    compute_type: str
+    mode: str
+    rtf: Optional[float]
+    expected_seconds: Optional[float]
+    target_latency: Optional[float]
+    reason: str
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _key(model_size: str, device: str, compute_type: str, mode: str = "single") -> str:
+    return f"{model_size}|{device}|{compute_type}|{mode}"
+
+
+def load_calibration(path: str = CALIBRATION_PATH) -> Dict[str, float]:
+    """{"<model>|<device>|<compute_type>|<mode>": real-time factor}"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["rtf"]
+    except FileNotFoundError:
+        return {}
+
+
+def select_model(
+    duration: Optional[float],
+    target_latency: Optional[float] = ASR_TARGET_LATENCY_SECONDS,
+    device: str = "cuda",
+    compute_type: Optional[str] = None,
+    default_model: str = "small",
+    calibration: Optional[Dict[str, float]] = None,
+    candidates: List[str] = MODEL_SIZES,
+    mode: str = "single",
+) -> ModelChoice:
+    """
+    Largest model whose expected ASR time (duration × RTF) fits the target
+    latency, using RTFs measured for this device / compute type / mode.
+    Falls back to the fastest calibrated model when nothing fits, and to
+    `default_model` when duration or calibration data is missing.
+    """
+    compute_type = resolve_compute_type(device, compute_type)
+    if calibration is None:
+        calibration = load_calibration()
+
+    measured = [
+        (size, calibration[_key(size, device, compute_type, mode)])
+        for size in candidates
+        if _key(size, device, compute_type, mode) in calibration
+    ]
+
+    if not duration or not target_latency or not measured:
+        return ModelChoice(
+            model_size=default_model,
+            device=device,
+            compute_type=compute_type,
+            mode=mode,
+            rtf=calibration.get(_key(default_model, device, compute_type, mode)),
+            expected_seconds=None,
+            target_latency=target_latency,
+            reason="no duration, deadline or calibration data",
+        )
+
+    fitting = [(size, rtf) for size, rtf in measured if duration * rtf <= target_latency]
+    if fitting:
+        # candidates xếp theo kích thước → phần tử cuối là model lớn nhất
+        size, rtf = fitting[-1]
+        reason = "largest model within deadline"
+    else:
+        size, rtf = min(measured, key=lambda item: item[1])
+        reason = "no model fits deadline, using fastest"
+
+    return ModelChoice(
+        model_size=size,
+        device=device,
+        compute_type=compute_type,
+        mode=mode,
+        rtf=rtf,
+        expected_seconds=round(duration * rtf, 1),
+        target_latency=target_latency,
+        reason=reason,
+    )
+
+
+# -----------------------
+# Calibration
+# -----------------------
+def measure_rtf(asr, audio_path: str, audio_seconds: float) -> Dict:
+    """Transcribe once and return wall time and real-time factor."""
+    start = time.perf_counter()
+    result = asr.transcribe(audio_path)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 2),
+        "rtf": round(elapsed / audio_seconds, 4),
+        "segments": len(result["raw_segments"]),
+    }
+
+
+def calibrate(
+    audio_path: str,
+    model_sizes: List[str],
+    device: str,
+    compute_type: Optional[str] = None,
+    path: str = CALIBRATION_PATH,
+    mode: str = "single",
+    batch_size: int = 16,
+    workers: Optional[int] = None,
+) -> Dict[str, float]:
+    """
+    Measure RTF for each model on this machine, in the given ASR mode, and
+    merge into the table. `batch_size` / `workers` should match what the
+    pipeline uses (ASR_BATCH_SIZE / ASR_CPU_WORKERS).
+    """
+    compute_type = resolve_compute_type(device, compute_type)
+    audio_seconds = len(decode_audio(audio_path, sampling_rate=16000)) / 16000
+    table = load_calibration(path)
+
+    for size in model_sizes:
+        if mode == "parallel":
+            asr = ParallelChunkedASR(model_size=size, compute_type=compute_type, workers=workers)
+            # Pool + model của worker chỉ khởi động ở lần gọi đầu → chạy một lần không tính giờ
+            asr.transcribe(audio_path)
+        else:
+            # Load trước để không tính thời gian load model vào RTF
+            asr = SimpleFasterWhisperASR(
+                model_size=size,
+                device=device,
+                compute_type=compute_type,
+                batched=mode == "batched",
+                batch_size=batch_size,
+            )
+        stats = measure_rtf(asr, audio_path, audio_seconds)
+        table[_key(size, device, compute_type, mode)] = stats["rtf"]
+        print(f"{size:<16} {device}/{compute_type}/{mode}: RTF {stats['rtf']:.4f} ({stats['seconds']}s)")
+        get_model_registry().clear()
+        get_worker_pools().shutdown()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"audio_seconds": round(audio_seconds, 1), "rtf": table}, f, indent=2, sort_keys=True)
+    return table
@@ -0,0 +1,264 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from faster_whisper import WhisperModel
+from faster_whisper.audio import decode_audio
+
+from audio_to_text.model_registry import WHISPER_IDLE_TIMEOUT_SECONDS, resolve_compute_type
+from audio_to_text.whisper_asr import TimedSegment, build_result, build_transcribe_kwargs
+
+
+SAMPLE_RATE = 16000
+# Whisper detect ngôn ngữ trên một cửa sổ 30s
+LANGUAGE_DETECTION_SECONDS = 30
+
+
+# -----------------------
+# Silence-based chunking
+# -----------------------
+def split_on_silence(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    max_chunk_seconds: float = 120.0,
+    min_chunk_seconds: float = 30.0,
+    frame_ms: int = 30,
+) -> List[Tuple[int, int]]:
+    """
+    Split audio into chunks of at most `max_chunk_seconds`, cutting at the
+    quietest frame between `min_chunk_seconds` and `max_chunk_seconds`
+    of each chunk. Returns [(start_sample, end_sample), ...].
+    """
+    total = len(audio)
+    max_len = int(max_chunk_seconds * sample_rate)
+    if total <= max_len:
+        return [(0, total)]
+
+    frame_len = max(1, sample_rate * frame_ms // 1000)
+    n_frames = total // frame_len
+    # RMS năng lượng theo frame, vectorized
+    frames = audio[: n_frames * frame_len].reshape(n_frames, frame_len)
+    energy = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+
+    max_frames = max_len // frame_len
+    min_frames = min(max(1, int(min_chunk_seconds * sample_rate) // frame_len), max_frames - 1)
+
+    cuts = [0]
+    while total - cuts[-1] > max_len:
+        start_frame = cuts[-1] // frame_len
+        lo = start_frame + min_frames
+        hi = min(start_frame + max_frames, n_frames)
+        quietest = lo + int(np.argmin(energy[lo:hi]))
+        # Cắt ở giữa frame im lặng nhất
+        cuts.append(quietest * frame_len + frame_len // 2)
+    cuts.append(total)
+
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+# -----------------------
+# Worker process
+# -----------------------
+_worker_model: WhisperModel | None = None
+
+
+def _init_worker(model_size: str, compute_type: str, cpu_threads: int):
+    global _worker_model
+    _worker_model = WhisperModel(
+        model_size,
+        device="cpu",
+        compute_type=compute_type,
+        cpu_threads=cpu_threads
+    )
+
+
+def _detect_language(audio: np.ndarray) -> Tuple[str, float]:
+    language, probability, _ = _worker_model.detect_language(audio)
+    return language, probability
+
+
+def _transcribe_chunk(audio: np.ndarray, offset: float, kwargs: Dict):
+    segments, info = _worker_model.transcribe(audio, **kwargs)
+    segments = [
+        TimedSegment(s.start + offset, s.end + offset, s.text)
+        for s in segments
+    ]
+    return segments, info.language, getattr(info, "language_probability", None)
+
+
+@dataclass
+class _PoolEntry:
+    pool: ProcessPoolExecutor
+    active: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class WorkerPools:
+    """
+    Process pools (one WhisperModel loaded per worker) kept alive across
+    transcriptions, keyed by (model_size, compute_type, cpu_threads, workers).
+    Pools unused for `idle_timeout` seconds are shut down, like models in
+    WhisperModelRegistry.
+    """
+
+    def __init__(self, idle_timeout: float | None = WHISPER_IDLE_TIMEOUT_SECONDS):
+        self.idle_timeout = idle_timeout
+        self._pools: dict[tuple, _PoolEntry] = {}
+        self._lock = threading.Lock()
+        self._reaper: threading.Thread | None = None
+
+    @contextmanager
+    def lease(self, model_size: str, compute_type: str, cpu_threads: int, workers: int):
+        """Pool for this config; never reaped while leased. A broken pool is dropped."""
+        key = (model_size, compute_type, cpu_threads, workers)
+        with self._lock:
+            entry = self._pools.get(key)
+            if entry is None:
+                print(f"[WorkerPools] Starting {workers} ASR workers ({model_size}, {compute_type})")
+                # spawn: ctranslate2 không an toàn với fork
+                pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(model_size, compute_type, cpu_threads),
+                )
+                entry = self._pools[key] = _PoolEntry(pool)
+            entry.active += 1
+        self._ensure_reaper()
+
+        try:
+            yield entry.pool
+        except BrokenProcessPool:
+            # Worker chết (OOM, ...) → bỏ pool, lần sau tạo mới
+            self.shutdown(key)
+            raise
+        finally:
+            with self._lock:
+                entry.active -= 1
+                entry.last_used = time.monotonic()
+
+    def shutdown(self, key: tuple | None = None):
+        with self._lock:
+            keys = [key] if key is not None else list(self._pools)
+            pools = [self._pools.pop(k).pool for k in keys if k in self._pools]
+        for pool in pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _ensure_reaper(self):
+        if self.idle_timeout is None:
+            return
+        with self._lock:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, name="asr-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        interval = max(1.0, min(60.0, self.idle_timeout / 4))
+        while True:
+            time.sleep(interval)
+            now = time.monotonic()
+            with self._lock:
+                idle = [
+                    key for key, entry in self._pools.items()
+                    if not entry.active and now - entry.last_used > self.idle_timeout
+                ]
+            for key in idle:
+                print(f"[WorkerPools] Stopping idle ASR workers ({key[0]}, {key[1]})")
+                self.shutdown(key)
+            with self._lock:
+                if not self._pools:
+                    self._reaper = None
+                    return
+
+
+_worker_pools: WorkerPools | None = None
+_worker_pools_lock = threading.Lock()
+
+
+def get_worker_pools() -> WorkerPools:
+    """Process-wide ASR worker pools."""
+    global _worker_pools
+    with _worker_pools_lock:
+        if _worker_pools is None:
+            _worker_pools = WorkerPools()
+        return _worker_pools
+
+
+class ParallelChunkedASR:
+    """
+    CPU ASR that splits the decoded audio at silences and transcribes the
+    chunks in a process pool (one WhisperModel per worker). The pool is
+    shared and kept warm across calls (see WorkerPools).
+    Output dict has the same format as SimpleFasterWhisperASR.transcribe.
+    """
+
+    def __init__(
+        self,
+        model_size="small",
+        compute_type=None,
+        workers: Optional[int] = None,
+        max_chunk_seconds: float = 120.0,
+        min_chunk_seconds: float = 30.0,
+        confidence_threshold=0.6
+    ):
+        cpu_count = os.cpu_count() or 1
+        self.model_size = model_size
+        self.compute_type = resolve_compute_type("cpu", compute_type)
+        self.workers = workers or max(1, cpu_count // 2)
+        # Chia đều core cho các worker
+        self.cpu_threads = max(1, cpu_count // self.workers)
+        self.max_chunk_seconds = max_chunk_seconds
+        self.min_chunk_seconds = min_chunk_seconds
+        self.confidence_threshold = confidence_threshold
+
+    def transcribe(
+        self,
+        audio_path: str,
+        language: Optional[str] = None,
+        mode: str = "full"   # "clean" | "full"
+    ) -> Dict:
+        audio = decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+        duration = len(audio) / SAMPLE_RATE
+        chunks = split_on_silence(
+            audio,
+            max_chunk_seconds=self.max_chunk_seconds,
+            min_chunk_seconds=self.min_chunk_seconds,
+        )
+        # Pool sống qua nhiều lần gọi: không spawn lại process / load lại model
+        with get_worker_pools().lease(self.model_size, self.compute_type, self.cpu_threads, self.workers) as pool:
+            # Chưa biết ngôn ngữ → detect trên 30s đầu, rồi submit mọi chunk cùng lúc
+            language_probability = None
+            if language is None:
+                language, language_probability = pool.submit(
+                    _detect_language, audio[: LANGUAGE_DETECTION_SECONDS * SAMPLE_RATE]
+                ).result()
+
+            kwargs = build_transcribe_kwargs(language, mode)
+            futures = [
+                pool.submit(_transcribe_chunk, audio[start:end], start / SAMPLE_RATE, kwargs)
+                for start, end in chunks
+            ]
+
+            segments = []
+            for idx, future in enumerate(futures):
+                chunk_segments, _, chunk_probability = future.result()
+                segments.extend(chunk_segments)
+                if idx == 0 and language_probability is None:
+                    language_probability = chunk_probability
+
+        return build_result(
+            segments,
+            duration=duration,
+            language=language,
+            language_probability=language_probability,
+            mode=mode,
+            confidence_threshold=self.confidence_threshold
+        )
@@ -1,5 +1,113 @@
-from faster_whisper import WhisperModel
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterator, NamedTuple, Optional
+from audio_to_text.model_registry import WhisperModelRegistry, get_model_registry, resolve_compute_type
+
+
+class TimedSegment(NamedTuple):
+    start: float
+    end: float
+    text: str
+
+
+def build_transcribe_kwargs(language: Optional[str] = None, mode: str = "full", beam_size: int = 5) -> Dict:
+    kwargs = {
+        "beam_size": beam_size,
+        "condition_on_previous_text": True  # giúp giữ mạch xuyên qua silence
+    }
+
+    # Clean = vẫn lọc silence
+    if mode == "clean":
+        kwargs["vad_filter"] = True
+        kwargs["vad_parameters"] = {
+            "min_silence_duration_ms": 1500,
+            "speech_pad_ms": 300
+        }
+
+    # Full = KHÔNG DÙNG VAD → không bao giờ dừng vì im lặng
+    else:
+        kwargs["vad_filter"] = False
+
+    if language:
+        kwargs["language"] = language
+
+    return kwargs
+
+
+def build_result(
+    segments,
+    duration: float,
+    language: str,
+    language_probability: Optional[float],
+    mode: str,
+    confidence_threshold: float = 0.6
+) -> Dict:
+    """
+    Normalize a list of segments (anything with .start/.end/.text)
+    into the ASR output dict. Timing stays structured in `raw_segments`;
+    no inline "[12.34s]" rendering (the payload builds columns from it).
+    """
+    raw_segments = [
+        {"start": s.start, "end": s.end, "text": s.text.strip()}
+        for s in segments
+    ]
+
+    return {
+        "duration": duration,
+        "language": language,
+        "language_confidence": language_probability,
+        "is_confident": (
+            (language_probability if language_probability is not None else 1.0)
+            >= confidence_threshold
+        ),
+        "mode": mode,
+        "raw_segments": raw_segments,
+        "text": " ".join(s["text"] for s in raw_segments if s["text"])
+    }
+
+
+class ASRStream:
+    """
+    Segments yielded as faster-whisper produces them.
+    Language and duration are known up front (detected before decoding);
+    `result()` returns the usual output dict once the stream is exhausted.
+    `release` (the model lease) is called once decoding ends.
+    """
+
+    def __init__(self, segments, info, mode: str, confidence_threshold: float, release: Optional[Callable[[], None]] = None):
+        self._segments = segments
+        self._release = release
+        self.language = info.language
+        self.duration = info.duration
+        self.language_probability = getattr(info, "language_probability", None)
+        self.mode = mode
+        self.confidence_threshold = confidence_threshold
+        self.segments: list[TimedSegment] = []
+        self.done = False
+
+    def __iter__(self) -> Iterator[TimedSegment]:
+        try:
+            for s in self._segments:
+                segment = TimedSegment(s.start, s.end, s.text)
+                self.segments.append(segment)
+                yield segment
+            self.done = True
+        finally:
+            self.close()
+
+    def close(self):
+        """Release the model lease (idempotent); called when iteration ends."""
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+    def result(self) -> Dict:
+        return build_result(
+            self.segments,
+            duration=self.duration,
+            language=self.language,
+            language_probability=self.language_probability,
+            mode=self.mode,
+            confidence_threshold=self.confidence_threshold
+        )
 
 
 class SimpleFasterWhisperASR:
@@ -8,22 +116,40 @@ class SimpleFasterWhisperASR:
         model_size="small",
         device="cuda",
         compute_type=None,  # Auto-detect based on device
-        confidence_threshold=0.6
+        confidence_threshold=0.6,
+        registry: WhisperModelRegistry | None = None,
+        batched: bool = False,  # GPU throughput: batched inference over VAD chunks
+        batch_size: int = 16,
+        beam_size: int = 5
     ):
         self.confidence_threshold = confidence_threshold
+        self.batched = batched
+        self.batch_size = batch_size
+        self.beam_size = beam_size
         # Auto-select compute_type: float16 for CUDA, int8 for CPU
-        if compute_type is None:
-            compute_type = "float16" if device == "cuda" else "int8"
-        self.model = WhisperModel(
-            model_size,
-            device=device,
-            compute_type=compute_type
-        )
+        compute_type = resolve_compute_type(device, compute_type)
+        # Model dùng chung qua registry → không load lại mỗi request.
+        # Load ngay ở đây; mỗi lần transcribe lease model cho tới khi decode xong
+        self.registry = registry or get_model_registry()
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.registry.get(model_size, device=device, compute_type=compute_type)
 
-    def _format_inline(self, segments):
-        return " ".join(
-            f"[{s.start:.2f}s] {s.text.strip()}" for s in segments
-        )
+    def _run(self, model, audio_path: str, language: Optional[str], mode: str):
+        kwargs = build_transcribe_kwargs(language, mode, beam_size=self.beam_size)
+
+        if not self.batched:
+            return model.transcribe(audio_path, **kwargs)
+
+        # BatchedInferencePipeline chỉ có từ faster-whisper 1.1.0
+        from faster_whisper import BatchedInferencePipeline
+
+        # Batched pipeline cần VAD để cắt chunk, không dùng previous-text conditioning
+        kwargs["vad_filter"] = True
+        kwargs.pop("condition_on_previous_text", None)
+        pipeline = BatchedInferencePipeline(model=model)
+        return pipeline.transcribe(audio_path, batch_size=self.batch_size, **kwargs)
 
     def transcribe(
         self,
@@ -32,49 +158,33 @@ class SimpleFasterWhisperASR:
         mode: str = "full"   # "clean" | "full"
     ) -> Dict:
 
-        kwargs = {
-            "beam_size": 5,
-            "condition_on_previous_text": True  # giúp giữ mạch xuyên qua silence
-        }
+        with self.registry.lease(self.model_size, self.device, self.compute_type) as model:
+            segments, info = self._run(model, audio_path, language, mode)
+            segments = list(segments)
 
-        # Clean = vẫn lọc silence
-        if mode == "clean":
-            kwargs["vad_filter"] = True
-            kwargs["vad_parameters"] = {
-                "min_silence_duration_ms": 1500,
-                "speech_pad_ms": 300
-            }
-
-        # Full = KHÔNG DÙNG VAD → không bao giờ dừng vì im lặng
-        else:
-            kwargs["vad_filter"] = False
-
-        if language:
-            kwargs["language"] = language
-
-        segments, info = self.model.transcribe(audio_path, **kwargs)
-        segments = list(segments)
-
-        formatted_lines = []
-        full_text = ""
-
-        for s in segments:
-            text = s.text.strip()
-            formatted_lines.append(
-                f"[{s.start:.2f}s -> {s.end:.2f}s] {text}"
-            )
-            full_text += text + " "
-
-        return {
-            "duration": info.duration,
-            "language": info.language,
-            "language_confidence": getattr(info, "language_probability", None),
-            "is_confident": (
-                getattr(info, "language_probability", 1.0)
-                >= self.confidence_threshold
-            ),
-            "mode": mode,
-            "segments": formatted_lines,
-            "inline_text": self._format_inline(segments),
-            "text": full_text.strip()
-        }
+        return build_result(
+            segments,
+            duration=info.duration,
+            language=info.language,
+            language_probability=getattr(info, "language_probability", None),
+            mode=mode,
+            confidence_threshold=self.confidence_threshold
+        )
+
+    def transcribe_stream(
+        self,
+        audio_path: str,
+        language: Optional[str] = None,
+        mode: str = "full"   # "clean" | "full"
+    ) -> ASRStream:
+        """
+        Like transcribe(), but segments are consumed lazily as they are
+        decoded. The model stays leased until the stream is exhausted.
+        """
+        key, model = self.registry.acquire(self.model_size, self.device, self.compute_type)
+        try:
+            segments, info = self._run(model, audio_path, language, mode)
+        except BaseException:
+            self.registry.release(key)
+            raise
+        return ASRStream(segments, info, mode, self.confidence_threshold, release=lambda: self.registry.release(key))
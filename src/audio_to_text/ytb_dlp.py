@@ -1,98 +1,137 @@
-import yt_dlp
-import os
-import re
-import unicodedata
+import resource
+import time
 from typing import Dict
+from fetch_transcript.video_info import VideoInfo, extract_video_info
+from audio_to_text.audio_cache import AudioCache
+
+
+def _cpu_seconds() -> float:
+    """CPU time of this process + finished child processes (ffmpeg)."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
 
 
 class YTBDlpDownloader:
+    """
+    audio_format:
+      - "native": keep the downloaded opus/m4a stream as-is (no re-encode);
+                  faster-whisper decodes it straight to 16 kHz PCM
+      - "wav":    ffmpeg decodes once to 16 kHz mono PCM (lossless for ASR)
+      - "mp3"/...: legacy lossy re-encode via FFmpegExtractAudio
+    """
+
     def __init__(
         self,
         output_dir="audio_downloads",
-        audio_format="mp3",
-        audio_quality="96"
+        audio_format="native",
+        audio_quality="96",
+        cache: AudioCache | None = None
     ):
         self.output_dir = output_dir
         self.audio_format = audio_format
         self.audio_quality = audio_quality
-
-        os.makedirs(self.output_dir, exist_ok=True)
-
-    # -----------------------
-    # Filename utils
-    # -----------------------
-    def _sanitize_filename_ascii(self, name: str) -> str:
-        """
-        Unicode → ASCII, an toàn cho mọi OS
-        """
-        name = unicodedata.normalize("NFKD", name)
-        name = name.encode("ascii", "ignore").decode("ascii")
-        name = re.sub(r'[^a-zA-Z0-9\s_-]', "", name)
-        name = re.sub(r'\s+', "_", name).strip("_")
-        return name or "audio"
-
-    def _build_file_and_title(self, title: str) -> Dict:
-        return {
-            "title": title,  # Hiển thị đẹp
-            "file_safe": self._sanitize_filename_ascii(title)
-        }
+        # File lưu theo video_id (không theo title) + manifest, có giới hạn dung lượng
+        self.cache = cache or AudioCache(output_dir)
+
+    def _postprocessors(self) -> list:
+        if self.audio_format == "native":
+            return []
+        return [{
+            "key": "FFmpegExtractAudio",
+            "preferredcodec": self.audio_format,
+            "preferredquality": self.audio_quality,
+        }]
 
     # -----------------------
     # Main API
     # -----------------------
-    def download(self, video_id: str) -> Dict:
+    def download(self, video_id: str, video_info: VideoInfo | None = None) -> Dict:
         url = f"https://www.youtube.com/watch?v={video_id}"
 
         try:
-            # Lấy metadata trước
-            with yt_dlp.YoutubeDL({"quiet": True}) as ydl:
-                info = ydl.extract_info(url, download=False)
-
-            title_data = self._build_file_and_title(
-                info.get("title", "unknown")
-            )
-
-            # ÉP yt-dlp dùng filename mình build
-            outtmpl = os.path.join(
-                self.output_dir,
-                f"{title_data['file_safe']}.%(ext)s"
-            )
+            # Cache hit → không gọi yt-dlp
+            cached = self.cache.get(video_id)
+            if cached is not None:
+                return {
+                    "status": "success",
+                    "cache_hit": True,
+                    "title": cached["title"],
+                    "file_safe": video_id,
+                    "file_path": cached["file_path"],
+                    "audio_format": cached["format"],
+                    "file_size": cached["size"],
+                    "cpu_seconds": 0.0,
+                    "wall_seconds": 0.0,
+                    "duration": cached["duration"],
+                    "uploader": None,
+                    "url": url
+                }
+
+            # Dùng lại info đã extract (nếu có), không gọi extract_info lần nữa
+            if video_info is None:
+                video_info = extract_video_info(video_id)
+            info = video_info.info
+
+            # Tên file = video_id: không trùng, không lỗi với title non-ASCII
+            outtmpl = self.cache.path_template(video_id)
+
+            audio_fmt = video_info.best_audio_format()
 
             ydl_opts = {
-                "format": "bestaudio/best",
+                "format": audio_fmt["format_id"] if audio_fmt else "bestaudio/best",
                 "outtmpl": outtmpl,
                 "extractor_args": {
                     "youtube": {
                         "player_client": ["android"]
                     }
                 },
-                "postprocessors": [{
-                    "key": "FFmpegExtractAudio",
-                    "preferredcodec": self.audio_format,
-                    "preferredquality": self.audio_quality,
-                }],
+                "postprocessors": self._postprocessors(),
                 "retries": 5,
                 "socket_timeout": 15,
                 "quiet": True,
                 "no_warnings": True,
                 "noplaylist": True
             }
-
-
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
-
-            file_path = os.path.join(
-                self.output_dir,
-                f"{title_data['file_safe']}.{self.audio_format}"
+            if self.audio_format == "wav":
+                # Resample thẳng về format Whisper dùng: 16 kHz mono
+                ydl_opts["postprocessor_args"] = {
+                    "extractaudio": ["-ar", "16000", "-ac", "1"]
+                }
+
+            import yt_dlp  # lazy: chỉ load khi thật sự download
+
+            cpu_start = _cpu_seconds()
+            wall_start = time.perf_counter()
+            try:
+                # Download thẳng từ info có sẵn (giống download_with_info_file)
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    result_info = ydl.process_ie_result(ydl.sanitize_info(info), download=True)
+            except yt_dlp.utils.DownloadError:
+                # Stream URL có thể đã hết hạn → extract lại
+                ydl_opts["format"] = "bestaudio/best"
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    result_info = ydl.extract_info(url, download=True)
+
+            file_path = result_info["requested_downloads"][0]["filepath"]
+            entry = self.cache.put(
+                video_id,
+                file_path,
+                audio_format=self.audio_format,
+                duration=info.get("duration"),
+                title=info.get("title")
             )
 
             return {
                 "status": "success",
-                "title": title_data["title"],
-                "file_safe": title_data["file_safe"],
+                "cache_hit": False,
+                "title": info.get("title", "unknown"),
+                "file_safe": video_id,
                 "file_path": file_path,
+                "audio_format": self.audio_format,
+                "file_size": entry["size"],
+                "cpu_seconds": round(_cpu_seconds() - cpu_start, 3),
+                "wall_seconds": round(time.perf_counter() - wall_start, 3),
                 "duration": info.get("duration"),
                 "uploader": info.get("uploader"),
                 "url": url
@@ -0,0 +1,90 @@
+import os
+import threading
+
+from fetch_transcript.youtube_fetcher import FetchResult, FetchStatus
+from utils.sqlite_cache import CACHE_DIR, SQLiteCache
+
+
+TRANSCRIPT_CACHE_PATH = os.path.join(CACHE_DIR, "transcripts.sqlite3")
+TRANSCRIPT_CACHE_TTL_SECONDS = float(os.getenv("TRANSCRIPT_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+class TranscriptCache:
+    """
+    Persistent transcript store keyed by (video_id, language_code, is_generated).
+
+    Each entry keeps the raw segments, the normalized payload (cleaned text,
+    duration, ...) and where it came from ("YouTube" or "ASR").
+    """
+
+    def __init__(
+        self,
+        path: str = TRANSCRIPT_CACHE_PATH,
+        ttl_seconds: float | None = TRANSCRIPT_CACHE_TTL_SECONDS,
+        max_bytes: int | None = TRANSCRIPT_CACHE_MAX_BYTES,
+    ):
+        self.store = SQLiteCache(
+            path,
+            table="transcripts",
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+        )
+
+    @staticmethod
+    def _key(video_id: str, language_code: str, is_generated: bool) -> str:
+        return f"{video_id}|{language_code}|{int(bool(is_generated))}"
+
+    def get(self, video_id: str, language_code: str, is_generated: bool) -> dict | None:
+        return self.store.get_json(self._key(video_id, language_code, is_generated))
+
+    def put(self, result: FetchResult, source: str = "YouTube"):
+        payload = result.transcript
+        self.store.set_json(
+            self._key(payload["video_id"], payload["language_code"], payload["is_generated"]),
+            {
+                "source": source,
+                "segments": result.segments or [],
+                "payload": payload,
+            }
+        )
+
+    def lookup(self, video_id: str, languages: list[str]) -> FetchResult | None:
+        """
+        Same preference as YouTubeTranscriptApi.find_transcript: languages in
+        order, manual captions before generated ones. ASR entries come last.
+        """
+        for language_code in languages:
+            for is_generated in (False, True):
+                entry = self.get(video_id, language_code, is_generated)
+                if entry is not None and entry["source"] != "ASR":
+                    return self._to_result(entry)
+
+        for key in self.store.keys(prefix=f"{video_id}|"):
+            entry = self.store.get_json(key)
+            if entry is not None and entry["source"] == "ASR":
+                return self._to_result(entry)
+
+        return None
+
+    @staticmethod
+    def _to_result(entry: dict) -> FetchResult:
+        return FetchResult(
+            ok=True,
+            status=FetchStatus.SUCCESS,
+            transcript=entry["payload"],
+            segments=entry["segments"],
+        )
+
+
+_default_cache: TranscriptCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def get_transcript_cache() -> TranscriptCache:
+    """Process-wide transcript cache."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TranscriptCache()
+        return _default_cache
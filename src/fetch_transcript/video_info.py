@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from schemas.output_format import OutlineOutput, SectionOutline
+
+
+# Stream URLs trong info hết hạn sau ~6h, giữ cache ngắn hơn nhiều
+VIDEO_INFO_TTL_SECONDS = float(os.getenv("VIDEO_INFO_TTL_SECONDS", 1800))
+VIDEO_INFO_CACHE_SIZE = int(os.getenv("VIDEO_INFO_CACHE_SIZE", 64))
+
+
+@dataclass
+class VideoInfo:
+    """
+    Result of ONE yt-dlp extraction for a video.
+    Metadata, chapters and the audio format choice are all derived from it.
+    """
+    video_id: str
+    info: dict
+    extracted_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def url(self) -> str:
+        return f"https://www.youtube.com/watch?v={self.video_id}"
+
+    @property
+    def title(self) -> str | None:
+        return self.info.get("title")
+
+    @property
+    def duration(self) -> float | None:
+        return self.info.get("duration")
+
+    def metadata(self) -> dict:
+        info = self.info
+        return {
+            "video_id": self.video_id,
+            "title": info.get("title"),
+            "description": info.get("description"),
+            "channel": info.get("channel"),
+            "channel_id": info.get("channel_id"),
+            "upload_date": info.get("upload_date"),
+            "duration": info.get("duration"),
+            "view_count": info.get("view_count"),
+            "like_count": info.get("like_count"),
+            "thumbnail": info.get("thumbnail"),
+            "tags": info.get("tags"),
+        }
+
+    def chapters(self) -> OutlineOutput | None:
+        chapters = self.info.get("chapters")
+        if not chapters:
+            return None
+
+        sections = [
+            SectionOutline(
+                section_id=idx + 1,
+                title=ch.get('title', f'Section {idx + 1}'),
+                start=ch.get('start_time', 0),
+                end=ch.get('end_time', 0),
+                keywords=[]  # YouTube chapters don't have keywords
+            )
+            for idx, ch in enumerate(chapters)
+        ]
+        return OutlineOutput(sections=sections)
+
+    def best_audio_format(self) -> dict | None:
+        """Pick the best audio-only format (highest bitrate)."""
+        audio_formats = [
+            f for f in self.info.get("formats") or []
+            if f.get("vcodec") == "none" and f.get("acodec") not in (None, "none")
+        ]
+        if not audio_formats:
+            return None
+        return max(audio_formats, key=lambda f: f.get("abr") or f.get("tbr") or 0)
+
+
+_cache: dict[str, VideoInfo] = {}
+_cache_lock = threading.Lock()
+
+
+def _get_cached(video_id: str) -> VideoInfo | None:
+    with _cache_lock:
+        video_info = _cache.get(video_id)
+        if video_info is None:
+            return None
+        if time.monotonic() - video_info.extracted_at > VIDEO_INFO_TTL_SECONDS:
+            del _cache[video_id]
+            return None
+        return video_info
+
+
+def _put_cached(video_info: VideoInfo):
+    with _cache_lock:
+        _cache.pop(video_info.video_id, None)
+        _cache[video_info.video_id] = video_info
+        # dict giữ thứ tự insert → phần tử đầu là cũ nhất
+        while len(_cache) > VIDEO_INFO_CACHE_SIZE:
+            del _cache[next(iter(_cache))]
+
+
+def extract_video_info(video_id: str, use_cache: bool = True) -> VideoInfo:
+    """
+    Run yt-dlp extraction once per video (no download).
+    Repeat calls for the same video_id within the TTL are served from memory.
+    Raises on extraction errors.
+    """
+    if use_cache:
+        cached = _get_cached(video_id)
+        if cached is not None:
+            return cached
+
+    import yt_dlp  # lazy: chỉ load khi thật sự extract
+
+    ydl_opts = {
+        'quiet': True,
+        'skip_download': True,
+        'no_warnings': True,
+    }
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(
+            f"https://youtube.com/watch?v={video_id}",
+            download=False
+        )
+
+    video_info = VideoInfo(video_id=video_id, info=info)
+    _put_cached(video_info)
+    return video_info
+
+
+def _flat_entry_ids(info: dict) -> list[str]:
+    """Video IDs of a flat playlist/channel extraction (channel tabs are nested)."""
+    if info.get("_type") not in ("playlist", "multi_video"):
+        return [info["id"]] if info.get("id") else []
+    video_ids = []
+    for entry in info.get("entries") or []:
+        if not entry:
+            continue
+        if entry.get("_type") in ("playlist", "multi_video") or entry.get("ie_key") == "YoutubeTab":
+            video_ids.extend(_flat_entry_ids(entry) if entry.get("entries") is not None else list_video_ids(entry["url"]))
+        elif entry.get("id"):
+            video_ids.append(entry["id"])
+    return video_ids
+
+
+def list_video_ids(url: str, limit: int | None = None) -> list[str]:
+    """
+    Expand a playlist or channel URL into video IDs (flat extraction,
+    no per-video requests). A channel URL without a tab lists its uploads.
+    """
+    import yt_dlp  # lazy: chỉ load khi thật sự extract
+
+    if "/@" in url or "/channel/" in url or "/c/" in url or "/user/" in url:
+        tail = url.rstrip("/").rsplit("/", 1)[-1]
+        if tail not in ("videos", "streams", "shorts", "playlists"):
+            url = url.rstrip("/") + "/videos"
+
+    ydl_opts = {
+        'quiet': True,
+        'skip_download': True,
+        'no_warnings': True,
+        'extract_flat': 'in_playlist',
+    }
+    if limit:
+        ydl_opts['playlistend'] = limit
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+
+    # Bỏ trùng, giữ thứ tự
+    video_ids = list(dict.fromkeys(_flat_entry_ids(info)))
+    return video_ids[:limit] if limit else video_ids
@@ -1,12 +1,20 @@
+import io
 import re
 from dataclasses import dataclass
 from enum import Enum, auto
+from typing import TYPE_CHECKING, Iterator
+
+import numpy as np
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import (
     TranscriptsDisabled,
     NoTranscriptFound
 )
 
+from preprocess.transcript_columns import TranscriptColumns
+
+if TYPE_CHECKING:
+    from fetch_transcript.video_info import VideoInfo
 
 
 
@@ -17,6 +25,29 @@ class FetchStatus(Enum):
     ERROR = auto()
 
 
+# Compiled once: bracketed tags (timestamps kept) and ♪ removed in one scan
+NOISE_PATTERN = re.compile(r"\[(?!\d+(?:\.\d+)?s\]).*?\]|♪")
+SENTENCE_START_PATTERN = re.compile(r"([.!?]\s+)([a-z])")
+
+
+def _clean_line(line: str) -> str:
+    # Regex chỉ chạy khi dòng có thể chứa tag; split/join = gộp whitespace + strip
+    if "[" in line or "♪" in line:
+        line = NOISE_PATTERN.sub("", line)
+    return " ".join(line.split())
+
+
+def _upper_sentence_start(match: re.Match) -> str:
+    return match.group(1) + match.group(2).upper()
+
+
+def _sentence_case(text: str) -> str:
+    text = text.lower()
+    if "." in text or "!" in text or "?" in text:
+        text = SENTENCE_START_PATTERN.sub(_upper_sentence_start, text)
+    return text
+
+
 @dataclass
 class FetchResult:
     ok: bool
@@ -24,6 +55,10 @@ class FetchResult:
     transcript: dict | None = None
     metadata: dict | None = None  # Video metadata (title, description, etc.)
     error: str | None = None
+    segments: list | None = None  # Raw timed segments: [{"text", "start", "duration"}]
+    video_info: "VideoInfo | None" = None  # Shared yt-dlp extraction for this video
+    timings: dict | None = None  # Stage timings (seconds) measured by VideoToTextNode
+    segment_stream: Iterator | None = None  # Streaming ASR: segments yielded while transcribing
 
 
 
@@ -50,12 +85,7 @@ class YouTubeTranscriptFetcher:
             last_seg = segments[-1]
             duration_seconds = last_seg.start + last_seg.duration
 
-            raw_text = "\n".join(
-                f"[{seg.start:.2f}s] {seg.text}"
-                for seg in segments
-            )
-
-            cleaned_text = self._clean_transcript(raw_text)
+            columns = self._clean_segments(segments)
 
             payload = {
                 "video_id": transcript.video_id,
@@ -68,13 +98,15 @@ class YouTubeTranscriptFetcher:
                     "seconds": round(duration_seconds, 2),
                     "minutes": round(duration_seconds / 60, 2)
                 },
-                "text": cleaned_text,
+                "text": columns.text,
+                "columns": columns.to_dict(),
             }
 
             return FetchResult(
                 ok=True,
                 status=FetchStatus.SUCCESS,
-                transcript=payload
+                transcript=payload,
+                segments=segments.to_raw_data()
             )
 
         except TranscriptsDisabled:
@@ -99,31 +131,57 @@ class YouTubeTranscriptFetcher:
             )
 
     # CLEAN LOGIC
-    def _clean_transcript(self, text: str) -> str:
-        lines = text.splitlines()
-        cleaned = []
-
-        for line in lines:
-            line = re.sub(
-                r"\[(?!\d+(\.\d+)?s\]).*?\]",
-                "",
-                line
-            )
-            line = re.sub(r"[♪]", "", line)
-            line = re.sub(r"\s+", " ", line).strip()
+    def _clean_segments(self, segments) -> TranscriptColumns:
+        """
+        Clean caption segments into transcript columns in a single pass.
 
-            if re.fullmatch(r"\[\d+(\.\d+)?s\]", line):
+        Same rules as the old whole-string cleaner: bracketed tags and ♪
+        removed, whitespace collapsed, lowercased then sentence-cased.
+        Captions with nothing left are dropped; if only a continuation line
+        survives, it is appended to the previous segment.
+        Each segment is written once into one output buffer.
+        """
+        buffer = io.StringIO()
+        starts, durations, offsets = [], [], []
+        pos = 0
+        last_char = ""
+
+        for seg in segments:
+            lines = seg.text.splitlines()
+            if not lines:
                 continue
-            if not line:
+            head = _clean_line(lines[0])
+            tail = " ".join(filter(None, map(_clean_line, lines[1:]))) if len(lines) > 1 else ""
+
+            if head or not starts:
+                text = f"{head} {tail}" if head and tail else head or tail
+                if not text:
+                    continue
+                text = _sentence_case(text)
+                if starts:
+                    buffer.write(" ")
+                    pos += 1
+                starts.append(seg.start)
+                durations.append(seg.duration)
+                offsets.append(pos)
+            elif tail:
+                # Dòng nối tiếp của caption rỗng → gắn vào segment trước
+                text = _sentence_case(tail)
+                if last_char in ".!?" and "a" <= text[0] <= "z":
+                    text = text[0].upper() + text[1:]
+                buffer.write(" ")
+                pos += 1
+                durations[-1] = max(durations[-1], seg.start + seg.duration - starts[-1])
+            else:
                 continue
 
-            cleaned.append(line)
+            buffer.write(text)
+            pos += len(text)
+            last_char = text[-1]
 
-        text_cleaned = " ".join(cleaned)
-        text_cleaned = text_cleaned.capitalize()
-        text_cleaned = re.sub(
-            r"([.!?]\s+)([a-z])",
-            lambda m: m.group(1) + m.group(2).upper(),
-            text_cleaned
+        return TranscriptColumns(
+            text=buffer.getvalue(),
+            start=np.asarray(starts, dtype=np.float64),
+            duration=np.asarray(durations, dtype=np.float64),
+            offsets=np.asarray(offsets, dtype=np.int64),
         )
-        return text_cleaned
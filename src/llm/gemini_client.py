@@ -1,17 +1,207 @@
+import asyncio
+import copy
 import os
-from google import genai
+import random
+import threading
+import time
+from functools import lru_cache
+from typing import Awaitable, Type, TypeVar
+
+from pydantic import BaseModel
+
+from llm.response_cache import LLMResponseCache, get_llm_cache
+
+
+GEMINI_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", 1000))
+GEMINI_TOKENS_PER_MINUTE = int(os.getenv("GEMINI_TOKENS_PER_MINUTE", 1_000_000))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", 5))
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", 120))
+
+# Ước lượng token từ số ký tự (đủ cho rate limit, không cần tokenizer)
+CHARS_PER_TOKEN = 4
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 30.0
+
+T = TypeVar("T", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def json_schema(schema: Type[BaseModel]) -> dict:
+    """model_json_schema() is rebuilt on every call; build it once per model."""
+    return schema.model_json_schema()
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _is_retryable(exc: Exception) -> bool:
+    import httpx
+    from google.genai import errors
+
+    if isinstance(exc, errors.APIError):
+        return exc.code == 429 or exc.code >= 500
+    # google-genai chạy trên httpx: timeout / lỗi kết nối không bị bọc thành APIError
+    return isinstance(exc, (asyncio.TimeoutError, ConnectionError, httpx.TimeoutException, httpx.TransportError))
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at `per_minute / 60` per second.
+    `per_minute <= 0` disables the limit.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0):
+        if self.capacity <= 0:
+            return
+        # Request lớn hơn cả bucket → chỉ chờ đầy bucket
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
 
 class GeminiClient:
-    def __init__(self, api_key: str | None = None, max_tokens: int = 100000):
+    """
+    Gemini client shared by all flows.
+
+    - One `genai.Client` (connection pool reused across calls).
+    - Async `generate_json` on a private event loop thread; `generate_json_sync`
+      and `run` let synchronous code use it.
+    - Exponential backoff with jitter on 429 / 5xx / timeouts.
+    - Token buckets for requests per minute and tokens per minute.
+    - JSON responses cached on disk by (model, prompt, config) hash.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        max_tokens: int = 100000,
+        requests_per_minute: int = GEMINI_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = GEMINI_TOKENS_PER_MINUTE,
+        max_retries: int = GEMINI_MAX_RETRIES,
+        timeout: float = GEMINI_TIMEOUT_SECONDS,
+        cache: LLMResponseCache | None = None,
+    ):
         if api_key is None:
             api_key = os.getenv("GEMINI_API_KEY")
 
         if not api_key:
             raise ValueError("GEMINI_API_KEY is required")
 
-        self.client = genai.Client(api_key=api_key)
+        # Import lúc tạo client: google.genai nặng, flow chỉ cần khi gọi LLM
+        from google import genai
+        from google.genai import types
+
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(timeout=int(timeout * 1000))
+        )
         self.models = self.client.models
         self.default_max_tokens = max_tokens
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.cache = cache if cache is not None else get_llm_cache()
+        # False → không đọc response đã cache (vẫn ghi response mới), xem fresh()
+        self.cache_lookup = True
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="gemini-client", daemon=True)
+        self._thread.start()
+        # Bucket tạo trên loop riêng → asyncio.Lock gắn đúng loop
+        self._request_bucket, self._token_bucket = self.run(self._make_buckets(requests_per_minute, tokens_per_minute))
+
+    @staticmethod
+    async def _make_buckets(requests_per_minute: int, tokens_per_minute: int):
+        return TokenBucket(requests_per_minute), TokenBucket(tokens_per_minute)
+
+    def fresh(self) -> "GeminiClient":
+        """
+        This client (same loop, rate limits and cache) with cached responses
+        ignored for its calls, e.g. when a summary is explicitly refreshed.
+        Fresh responses are still stored.
+        """
+        client = copy.copy(self)
+        client.cache_lookup = False
+        return client
+
+    # -----------------------
+    # Sync bridge
+    # -----------------------
+    def run(self, coro: Awaitable):
+        """Run a coroutine on the client loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    # -----------------------
+    # Async API
+    # -----------------------
+    async def generate_content(self, prompt: str, model: str, config: dict):
+        tokens = estimate_tokens(prompt)
+
+        for attempt in range(self.max_retries + 1):
+            # Mỗi lần thử (kể cả retry sau 429/5xx) là một request mới → qua rate limiter
+            await self._request_bucket.acquire()
+            await self._token_bucket.acquire(tokens)
+            try:
+                return await asyncio.wait_for(
+                    self.client.aio.models.generate_content(model=model, contents=prompt, config=config),
+                    timeout=self.timeout
+                )
+            except Exception as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt)
+                delay *= random.uniform(0.5, 1.0)
+                print(f"[GeminiClient] {model} attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def generate_json(
+        self,
+        prompt: str,
+        schema: Type[T],
+        model: str,
+        temperature: float = 0.2,
+        max_tokens: int | None = None,
+        use_cache: bool = True,
+    ) -> T:
+        """
+        Generate and validate a response against a pydantic model.
+        Only responses that validate are written to the cache.
+        """
+        config = {
+            "temperature": temperature,
+            "response_mime_type": "application/json",
+            "response_json_schema": json_schema(schema),
+        }
+        if max_tokens is not None:
+            config["max_output_tokens"] = max_tokens
+
+        if use_cache:
+            text = self.cache.get(model, prompt, config, lookup=self.cache_lookup)
+            if text is not None:
+                return schema.model_validate_json(text)
+
+        response = await self.generate_content(prompt, model, config)
+        result = schema.model_validate_json(response.text)
+        if use_cache:
+            self.cache.set(model, prompt, config, response.text)
+        return result
+
+    def generate_json_sync(self, prompt: str, schema: Type[T], model: str, temperature: float = 0.2, max_tokens: int | None = None, use_cache: bool = True) -> T:
+        return self.run(self.generate_json(prompt, schema, model, temperature, max_tokens, use_cache))
 
     def generate(
         self,
@@ -23,7 +213,7 @@ class GeminiClient:
     ):
         if max_tokens is None:
             max_tokens = self.default_max_tokens
-            
+
         config = {
             "max_output_tokens": max_tokens,
             "temperature": temperature,
@@ -32,10 +222,18 @@ class GeminiClient:
         if json_output:
             config["response_mime_type"] = "application/json"
 
-        response = self.client.generate_text(
-            model=model,
-            prompt=prompt,
-            **config
-        )
+        response = self.run(self.generate_content(prompt, model, config))
+        return response.text.strip()
+
+
+_client: GeminiClient | None = None
+_client_lock = threading.Lock()
+
 
-        return response.text.strip()
\ No newline at end of file
+def get_gemini_client() -> GeminiClient:
+    """Process-wide Gemini client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GeminiClient()
+        return _client
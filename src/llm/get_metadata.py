@@ -1,42 +1,21 @@
-import yt_dlp
+from fetch_transcript.video_info import VideoInfo, extract_video_info
 
 
-def get_video_metadata(video_id: str) -> dict:
+def get_video_metadata(video_id: str, video_info: VideoInfo | None = None) -> dict:
     """
     Fetch video metadata from YouTube without downloading the video.
     
     Args:
         video_id: YouTube video ID
+        video_info: Already extracted VideoInfo (skips a new yt-dlp call)
         
     Returns:
         dict: JSON object containing video metadata
     """
-    ydl_opts = {
-        'quiet': True,
-        'skip_download': True,
-        'no_warnings': True,
-    }
-    
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(
-                f"https://youtube.com/watch?v={video_id}", 
-                download=False 
-            )
-            
-            return {
-                "video_id": video_id,
-                "title": info.get("title"),
-                "description": info.get("description"),
-                "channel": info.get("channel"),
-                "channel_id": info.get("channel_id"),
-                "upload_date": info.get("upload_date"),
-                "duration": info.get("duration"),
-                "view_count": info.get("view_count"),
-                "like_count": info.get("like_count"),
-                "thumbnail": info.get("thumbnail"),
-                "tags": info.get("tags"),
-            }
+        if video_info is None:
+            video_info = extract_video_info(video_id)
+        return video_info.metadata()
     except Exception as e:
         return {
             "video_id": video_id,
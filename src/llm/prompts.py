@@ -1,3 +1,27 @@
+import os
+
+from preprocess.transcript_columns import TranscriptColumns
+
+
+# Outline chỉ cần ranh giới gần đúng → timestamp thưa, làm tròn (tiết kiệm token)
+OUTLINE_TIMESTAMP_INTERVAL = float(os.getenv("OUTLINE_TIMESTAMP_INTERVAL", 15))
+OUTLINE_TIMESTAMP_PRECISION = int(os.getenv("OUTLINE_TIMESTAMP_PRECISION", 0))
+OUTLINE_TIMESTAMP_SENTENCES = os.getenv("OUTLINE_TIMESTAMP_SENTENCES", "0") == "1"
+
+
+def format_transcript(transcript: TranscriptColumns | str, timestamps: bool = True, **render) -> str:
+    """
+    Transcript text for a prompt. Columns are rendered with "[12.34s]"
+    markers (see TranscriptColumns.timestamped for `render` options) or,
+    with timestamps=False, as plain text.
+    """
+    if not isinstance(transcript, TranscriptColumns):
+        return transcript
+    if not timestamps:
+        return transcript.text
+    return transcript.timestamped(**render)
+
+
 # 1. Outline / Segmentation Prompt
 
 OUTLINE_PROMPT = """
@@ -75,11 +99,35 @@ Return ONLY valid JSON, no explanations.
 """
 
 
-def build_outline_prompt(video_transcript: str, video_language: str = "English", video_duration: float = None) -> str:
+# Section-count targets encoded in OUTLINE_PROMPT: (max duration in minutes, min, max)
+OUTLINE_SECTION_TARGETS = [
+    (10, 1, 3),
+    (30, 3, 5),
+    (60, 4, 7),
+    (120, 5, 8),
+    (float("inf"), 6, 10),
+]
+
+
+def target_section_range(video_duration: float) -> tuple[int, int]:
+    """(min, max) section count OUTLINE_PROMPT asks for at this duration (seconds)."""
+    minutes = (video_duration or 0) / 60
+    for max_minutes, low, high in OUTLINE_SECTION_TARGETS:
+        if minutes <= max_minutes:
+            return low, high
+    return OUTLINE_SECTION_TARGETS[-1][1:]
+
+
+def build_outline_prompt(video_transcript: TranscriptColumns | str, video_language: str = "English", video_duration: float = None) -> str:
     video_duration_minutes = video_duration // 60
     
     return OUTLINE_PROMPT.format(
-        video_transcript=video_transcript,
+        video_transcript=format_transcript(
+            video_transcript,
+            interval=OUTLINE_TIMESTAMP_INTERVAL,
+            precision=OUTLINE_TIMESTAMP_PRECISION,
+            sentence_boundaries=OUTLINE_TIMESTAMP_SENTENCES,
+        ),
         video_language=video_language,
         video_duration=video_duration,
         video_duration_minutes=video_duration_minutes
@@ -124,6 +172,59 @@ def build_section_summary_prompt(
     )
 
 
+# 2b. Section Summary Prompt (parallel mode: context from the outline, not memory)
+
+SECTION_SUMMARY_OUTLINE_PROMPT = """
+You are summarizing one section of a long video.
+Other sections are summarized separately, so rely only on the outline below for context.
+
+Language:
+{video_language}
+
+Video outline (neighbouring sections):
+{outline_context}
+
+Current section: {section_title}
+
+Current section transcript:
+{section_text}
+
+Rules:
+- The language used matches the language of the video is {video_language}
+- Write a concise and clear summary
+- Correct transcription errors silently
+- Focus only on the content of the current section; do not summarize neighbouring sections
+- The summary MUST be written in {video_language} only, not in any other language.
+
+Return the result strictly in JSON format with language {video_language}.
+"""
+
+
+def build_outline_context(sections, index: int, window: int = 1) -> str:
+    """Titles + keywords of the sections around `index` (SectionOutline list)."""
+    lines = []
+    for i in range(max(0, index - window), min(len(sections), index + window + 1)):
+        sec = sections[i]
+        marker = "→ (current)" if i == index else "-"
+        keywords = f" [{', '.join(sec.keywords)}]" if sec.keywords else ""
+        lines.append(f"{marker} {sec.section_id}. {sec.title}{keywords}")
+    return "\n".join(lines)
+
+
+def build_section_summary_prompt_with_outline(
+    section_text: str,
+    section_title: str,
+    outline_context: str,
+    video_language: str = "English"
+) -> str:
+    return SECTION_SUMMARY_OUTLINE_PROMPT.format(
+        section_text=section_text,
+        section_title=section_title,
+        outline_context=outline_context,
+        video_language=video_language
+    )
+
+
 # 3. Overall Summary Prompt
 
 GLOBAL_SUMMARY_PROMPT = """
@@ -228,11 +329,11 @@ Remember: A good summary is SHORTER than the original, not longer.
 
 
 def build_direct_summary_prompt(
-    transcript: str,
+    transcript: TranscriptColumns | str,
     video_language: str = "English"
 ) -> str:
     return DIRECT_SUMMARY_PROMPT.format(
-        transcript=transcript,
+        transcript=format_transcript(transcript, timestamps=False),
         video_language=video_language
     )
 
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import threading
+
+from utils.sqlite_cache import CACHE_DIR, PIPELINE_VERSION, SQLiteCache
+
+
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_responses.sqlite3")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# "0" → bỏ qua lookup (vẫn ghi response mới vào cache)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") == "1"
+
+
+class LLMResponseCache:
+    """
+    Gemini response text keyed by a hash of (pipeline version, model, prompt,
+    generation config).
+
+    The config holds temperature, max tokens and the response JSON schema, so
+    any change to those is a different key. With `enabled=False` (or
+    `lookup=False` on a call) lookups are bypassed but fresh responses are
+    still stored.
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        ttl_seconds: float | None = LLM_CACHE_TTL_SECONDS,
+        max_bytes: int | None = LLM_CACHE_MAX_BYTES,
+        enabled: bool = LLM_CACHE_ENABLED,
+    ):
+        self.store = SQLiteCache(
+            path,
+            table="llm_responses",
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+        )
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, prompt: str, config: dict) -> str:
+        data = json.dumps([PIPELINE_VERSION, model, prompt, config], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, prompt: str, config: dict, lookup: bool = True) -> str | None:
+        text = None
+        if self.enabled and lookup:
+            value = self.store.get(self.key(model, prompt, config))
+            text = value.decode("utf-8") if value is not None else None
+
+        with self._lock:
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return text
+
+    def set(self, model: str, prompt: str, config: dict, text: str):
+        self.store.set(self.key(model, prompt, config), text.encode("utf-8"))
+
+    def stats(self) -> dict:
+        """Cumulative hit/miss counts for this process."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_cache: LLMResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Process-wide LLM response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache()
+        return _cache
+
+
+def cache_stats_since(before: dict) -> dict:
+    """Hits/misses accumulated since an earlier `stats()` snapshot."""
+    now = get_llm_cache().stats()
+    return {name: now[name] - before.get(name, 0) for name in now}
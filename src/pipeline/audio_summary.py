@@ -1,22 +1,130 @@
 from audio_to_text.ytb_dlp import YTBDlpDownloader
-from audio_to_text.whisper_asr import SimpleFasterWhisperASR
+from audio_to_text.whisper_asr import ASRStream, SimpleFasterWhisperASR
+from audio_to_text.parallel_asr import ParallelChunkedASR
 from fetch_transcript.youtube_fetcher import FetchResult, FetchStatus
+from fetch_transcript.video_info import VideoInfo
+from audio_to_text.model_registry import get_model_registry
+from audio_to_text.model_selection import select_model
+from preprocess.transcript_columns import TranscriptColumns
 import json
-import torch
+import os
 
-def ytb_video_to_transcript(video_id: str) -> FetchResult:
+
+ASR_MODEL_SIZE = "small"  # Default / warm-up model; per video the size comes from select_model
+# >1 → CPU-only nodes chia audio thành chunk và transcribe song song (0 = tắt)
+ASR_CPU_WORKERS = int(os.getenv("ASR_CPU_WORKERS", 0))
+# GPU: batched inference over VAD chunks (throughput), batch size tuỳ VRAM
+ASR_BATCHED = os.getenv("ASR_BATCHED", "0") == "1"
+ASR_BATCH_SIZE = int(os.getenv("ASR_BATCH_SIZE", 16))
+# "native" (no re-encode) | "wav" (16 kHz mono PCM) | "mp3" (legacy)
+ASR_AUDIO_FORMAT = os.getenv("ASR_AUDIO_FORMAT", "native")
+# Độ dài video "điển hình" để chọn model warm-up giống select_model
+ASR_WARMUP_DURATION_SECONDS = float(os.getenv("ASR_WARMUP_DURATION_SECONDS", 600))
+
+
+def default_asr_device() -> str:
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def asr_mode(device: str, stream: bool = False) -> str:
+    """Calibration mode (see model_selection.ASR_MODES) of the ASR path a video takes."""
+    if device == "cuda" and ASR_BATCHED:
+        return "batched"
+    if device == "cpu" and ASR_CPU_WORKERS > 1 and not stream:
+        return "parallel"
+    return "single"
+
+
+def warmup_asr_model(model_size: str | None = None, device: str | None = None):
+    """
+    Preload the Whisper model used by the ASR fallback (e.g. at app startup).
+    Without `model_size`, warms the model select_model picks for a video of
+    ASR_WARMUP_DURATION_SECONDS on this device.
+    """
+    device = device or default_asr_device()
+    if model_size is None:
+        mode = asr_mode(device)
+        if mode == "parallel":
+            # ParallelChunkedASR load model trong process worker, không dùng registry
+            print("[ASR] Parallel CPU mode: workers start with the first video")
+            return
+        choice = select_model(ASR_WARMUP_DURATION_SECONDS, device=device, default_model=ASR_MODEL_SIZE, mode=mode)
+        print(f"[ASR] Warm-up model: {choice.model_size} ({choice.reason})")
+        get_model_registry().warmup(choice.model_size, device=device, compute_type=choice.compute_type)
+    else:
+        get_model_registry().warmup(model_size, device=device)
+
+
+def _build_asr(device: str, model_size: str = ASR_MODEL_SIZE) -> SimpleFasterWhisperASR:
+    return SimpleFasterWhisperASR(
+        model_size=model_size,
+        device=device,
+        batched=ASR_BATCHED and device == "cuda",
+        batch_size=ASR_BATCH_SIZE
+    )
+
+
+def _build_payload(video_id: str, whisper_result: dict) -> dict:
+    """Normalize ASR output to match YouTube fetch format."""
+    raw_segments = whisper_result.get("raw_segments", [])
+    columns = TranscriptColumns.from_segments(
+        (s["start"] for s in raw_segments),
+        (s["end"] - s["start"] for s in raw_segments),
+        (s["text"] for s in raw_segments),
+    )
+    return {
+        "video_id": video_id,
+        "language": whisper_result.get("language", "unknown"),
+        "language_code": whisper_result.get("language", "unknown"),
+        "is_generated": False,  # ASR-generated, not official captions
+        "is_translatable": False,
+        "translation_languages": [],
+        "duration": {
+            "seconds": round(whisper_result.get("duration", 0), 2),
+            "minutes": round(whisper_result.get("duration", 0) / 60, 2)
+        },
+        "text": columns.text,
+        "columns": columns.to_dict(),
+        "source": "ASR",  # Mark as ASR-generated
+        "language_confidence": whisper_result.get("language_confidence"),
+    }
+
+
+def _build_segments(whisper_result: dict) -> list:
+    return [
+        {"text": s["text"], "start": s["start"], "duration": s["end"] - s["start"]}
+        for s in whisper_result.get("raw_segments", [])
+    ]
+
+
+def _stream_into(result: FetchResult, asr_stream: ASRStream):
+    """Yield segments while decoding, then fill in the full transcript payload."""
+    yield from asr_stream
+    whisper_result = asr_stream.result()
+    result.transcript.update(_build_payload(result.transcript["video_id"], whisper_result))
+    result.segments = _build_segments(whisper_result)
+    print("Streaming transcription done")
+
+
+def ytb_video_to_transcript(video_id: str, video_info: VideoInfo | None = None, stream: bool = False) -> FetchResult:
     """
     Convert YouTube video to transcript using ASR (Whisper).
     Returns FetchResult with same structure as YouTubeTranscriptFetcher.
+    `video_info` is the shared yt-dlp extraction, reused for the download.
+
+    stream=True: returns as soon as language/duration are known, with
+    `segment_stream` yielding TimedSegment while transcription runs.
+    The payload text is filled in once the stream is exhausted.
     """
     try:
         # Step 1: Download video and extract audio
+        # Giữ nguyên stream opus/m4a: không encode lại mp3 rồi decode lần nữa
         downloader = YTBDlpDownloader(
             output_dir="audio_downloads",
-            audio_format="mp3",
-            audio_quality="96"
+            audio_format=ASR_AUDIO_FORMAT
         )
-        download_result = downloader.download(video_id)
+        download_result = downloader.download(video_id, video_info=video_info)
         
         if download_result["status"] != "success":
             return FetchResult(
@@ -26,40 +134,69 @@ def ytb_video_to_transcript(video_id: str) -> FetchResult:
             )
         
         file_path = download_result["file_path"]
+        if download_result["cache_hit"]:
+            print(f"Audio cache hit: {file_path}")
+        else:
+            print(
+                f"Audio ({download_result['audio_format']}): "
+                f"{download_result['file_size'] / 1e6:.1f} MB, "
+                f"download+postprocess CPU {download_result['cpu_seconds']:.1f}s"
+            )
 
         # Step 2: Transcribe audio to text
-        device = "cuda" if torch.cuda.is_available() else "cpu"
+        # Model giữ warm trong registry, không xoá sau mỗi request
+        device = default_asr_device()
         print(f"Using device: {device}")
-        model = SimpleFasterWhisperASR(model_size="small", device=device)
+
+        # Model lớn nhất vẫn kịp deadline với độ dài video này
+        choice = select_model(
+            download_result.get("duration"),
+            device=device,
+            default_model=ASR_MODEL_SIZE,
+            mode=asr_mode(device, stream),
+        )
+        print(
+            f"ASR model: {choice.model_size} ({choice.reason}, "
+            f"expected {choice.expected_seconds}s / target {choice.target_latency}s)"
+        )
+
+        if stream:
+            model = _build_asr(device, choice.model_size)
+            asr_stream = model.transcribe_stream(file_path)
+            try:
+                payload = _build_payload(video_id, {
+                    "language": asr_stream.language,
+                    "duration": asr_stream.duration,
+                    "language_confidence": asr_stream.language_probability,
+                })
+            except BaseException:
+                # Stream sẽ không bao giờ được đọc → trả lease model ngay
+                asr_stream.close()
+                raise
+            payload["asr_model"] = choice.to_dict()
+            result = FetchResult(
+                ok=True,
+                status=FetchStatus.SUCCESS,
+                transcript=payload,
+            )
+            result.segment_stream = _stream_into(result, asr_stream)
+            return result
+
+        if choice.mode == "parallel":
+            model = ParallelChunkedASR(model_size=choice.model_size, workers=ASR_CPU_WORKERS)
+        else:
+            model = _build_asr(device, choice.model_size)
         whisper_result = model.transcribe(file_path)
         
-        del model
-        if device == "cuda":
-            torch.cuda.empty_cache()
-        
         print("Transcription done, building result...")
         # Step 3: Normalize output to match YouTube fetch format
-        payload = {
-            "video_id": video_id,
-            "language": whisper_result.get("language", "unknown"),
-            "language_code": whisper_result.get("language", "unknown"),
-            "is_generated": False,  # ASR-generated, not official captions
-            "is_translatable": False,
-            "translation_languages": [],
-            "duration": {
-                "seconds": round(whisper_result.get("duration", 0), 2),
-                "minutes": round(whisper_result.get("duration", 0) / 60, 2)
-            },
-            "text": whisper_result.get("text", ""),
-            "raw_text": whisper_result.get("inline_text", ""),  # Include formatted segments
-            "source": "ASR",  # Mark as ASR-generated
-            "language_confidence": whisper_result.get("language_confidence"),
-        }
-
+        payload = _build_payload(video_id, whisper_result)
+        payload["asr_model"] = choice.to_dict()
         return FetchResult(
             ok=True,
             status=FetchStatus.SUCCESS,
-            transcript=payload
+            transcript=payload,
+            segments=_build_segments(whisper_result)
         )
         
     except Exception as e:
@@ -67,4 +204,4 @@ def ytb_video_to_transcript(video_id: str) -> FetchResult:
             ok=False,
             status=FetchStatus.ERROR,
             error=f"ASR failed: {str(e)}"
-        )
\ No newline at end of file
+        )
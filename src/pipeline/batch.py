@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+from pipeline.router import TranscriptRouter, VideoToTextNode
+from pipeline.scheduler import StageScheduler, VideoJob
+from pipeline.result_store import get_result_store
+from fetch_transcript.video_info import list_video_ids
+
+
+# Mỗi stage một pool riêng: network rẻ, ASR nặng (GPU/CPU), LLM giới hạn theo quota
+BATCH_FETCH_WORKERS = int(os.getenv("BATCH_FETCH_WORKERS", 8))
+BATCH_ASR_WORKERS = int(os.getenv("BATCH_ASR_WORKERS", 1))
+BATCH_LLM_WORKERS = int(os.getenv("BATCH_LLM_WORKERS", 4))
+# Số video tối đa đang nằm trong pipeline (giữ transcript trong RAM)
+BATCH_MAX_IN_FLIGHT = int(os.getenv("BATCH_MAX_IN_FLIGHT", 32))
+
+
+def video_id_from_url(value: str) -> str | None:
+    """Video ID from a watch / youtu.be / shorts URL, or the value itself if it is a bare ID."""
+    if "://" not in value:
+        return value
+    parsed = urlparse(value)
+    if parsed.netloc.endswith("youtu.be"):
+        return parsed.path.strip("/") or None
+    if "v" in parse_qs(parsed.query):
+        return parse_qs(parsed.query)["v"][0]
+    if parsed.path.startswith(("/shorts/", "/live/")):
+        return parsed.path.split("/")[2]
+    return None
+
+
+def read_video_ids(source: str, limit: int | None = None) -> list[str]:
+    """
+    Expand a batch source into video IDs:
+      - a text file: one video ID or URL per line (blank lines / # comments skipped);
+        playlist or channel URLs inside the file are expanded too
+      - a playlist or channel URL
+    """
+    if Path(source).is_file():
+        lines = Path(source).read_text(encoding="utf-8").splitlines()
+    else:
+        lines = [source]
+
+    video_ids = {}  # dict giữ thứ tự + bỏ trùng
+    for line in lines:
+        if limit and len(video_ids) >= limit:
+            break
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        video_id = video_id_from_url(line)
+        if video_id is not None:
+            video_ids[video_id] = None
+        else:
+            # Chỉ liệt kê phần còn thiếu (playlistend) thay vì cả playlist / channel
+            remaining = limit - len(video_ids) if limit else None
+            video_ids.update(dict.fromkeys(list_video_ids(line, limit=remaining)))
+
+    video_ids = list(video_ids)
+    return video_ids[:limit] if limit else video_ids
+
+
+class BatchRunner:
+    """
+    Summarize many videos in one process. Stages are pipelined by a
+    StageScheduler (fetch → ASR for videos without captions → LLM), each on
+    its own bounded pool.
+
+    One JSON line per video is appended to `output_path` as soon as it
+    finishes; a failure is recorded with its stage and never stops the batch.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        summary_language: str = None,
+        fetch_workers: int = BATCH_FETCH_WORKERS,
+        asr_workers: int = BATCH_ASR_WORKERS,
+        llm_workers: int = BATCH_LLM_WORKERS,
+        max_in_flight: int = BATCH_MAX_IN_FLIGHT,
+        refresh: bool = False,
+    ):
+        self.output_path = output_path
+        self.summary_language = summary_language
+        # refresh: bỏ qua kết quả đã lưu / checkpoint / LLM cache, tóm tắt lại và ghi đè
+        self.refresh = refresh
+        self.result_store = get_result_store()
+        # Dùng chung cho cả batch: không dựng lại client / cache mỗi video
+        self.node = VideoToTextNode()
+        self.router = TranscriptRouter()
+        self.scheduler = StageScheduler(fetch_slots=fetch_workers, asr_slots=asr_workers, llm_slots=llm_workers)
+        self._slots = threading.BoundedSemaphore(max(1, max_in_flight))
+
+        self._write_lock = threading.Lock()
+        self._done = threading.Condition()
+        self._finished = 0
+        self._failed = 0
+
+    def _finish(self, future):
+        job: VideoJob = future.result()
+        try:
+            record = {
+                "video_id": job.video_id,
+                "ok": job.ok,
+                "stage": job.stage,
+                "error": job.error,
+                "timings": job.timings,
+            }
+            if job.ok:
+                self.result_store.put(job.video_id, job.summary_language, job.result, job.transcript)
+                record["source"] = job.transcript.transcript.get("source", "YouTube")
+                record["language"] = job.transcript.transcript["language"]
+                record["result"] = job.result.model_dump()
+
+            self._write(record)
+            status = "ok" if job.ok else f"FAILED at {job.stage}: {job.error}"
+            print(f"[batch] {job.video_id} {status} ({job.timings['total_seconds']}s)")
+        finally:
+            # Luôn trả slot, kể cả khi ghi output lỗi → batch không bị treo
+            self._slots.release()
+            self._count(ok=job.ok)
+
+    def _write(self, record: dict):
+        with self._write_lock:
+            with open(self.output_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _count(self, ok: bool):
+        with self._done:
+            self._finished += 1
+            self._failed += not ok
+            self._done.notify_all()
+
+    def _from_store(self, video_id: str) -> bool:
+        """Write the stored result for `video_id` if there is one (no slot, no stages)."""
+        stored = None if self.refresh else self.result_store.get(video_id, self.summary_language)
+        if stored is None:
+            return False
+        self._write({
+            "video_id": video_id,
+            "ok": True,
+            "stage": "stored",
+            "error": None,
+            "timings": {"total_seconds": 0.0},
+            "source": stored.metadata.get("source"),
+            "language": stored.metadata.get("language"),
+            "result": stored.result.model_dump(),
+        })
+        print(f"[batch] {video_id} ok (stored result)")
+        self._count(ok=True)
+        return True
+
+    def run(self, video_ids: list[str]) -> dict:
+        wall_start = time.perf_counter()
+        print(f"[batch] {len(video_ids)} videos → {self.output_path}")
+
+        try:
+            for video_id in video_ids:
+                if self._from_store(video_id):
+                    continue
+                # Backpressure: không fetch trước quá nhiều so với LLM
+                self._slots.acquire()
+                job = VideoJob(video_id, summary_language=self.summary_language, refresh=self.refresh)
+                self.scheduler.submit(job, self.node, self.router).future.add_done_callback(self._finish)
+
+            with self._done:
+                self._done.wait_for(lambda: self._finished == len(video_ids))
+        finally:
+            self.scheduler.shutdown(wait=True)
+
+        summary = {
+            "videos": len(video_ids),
+            "ok": self._finished - self._failed,
+            "failed": self._failed,
+            "wall_seconds": round(time.perf_counter() - wall_start, 3),
+            "stages": self.scheduler.stats(),
+        }
+        print(
+            f"[batch] Done: {summary['ok']} ok, {summary['failed']} failed "
+            f"in {summary['wall_seconds']}s"
+        )
+        print(f"[batch] Stages: {self.scheduler.format_stats()}")
+        return summary
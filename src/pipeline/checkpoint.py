@@ -0,0 +1,77 @@
+import os
+import threading
+
+from schemas.output_format import OutlineOutput
+from utils.sqlite_cache import CACHE_DIR, PIPELINE_VERSION, SQLiteCache
+
+
+CHECKPOINT_PATH = os.path.join(CACHE_DIR, "checkpoints.sqlite3")
+CHECKPOINT_TTL_SECONDS = float(os.getenv("CHECKPOINT_TTL_SECONDS", 7 * 24 * 3600))
+CHECKPOINT_MAX_BYTES = int(os.getenv("CHECKPOINT_MAX_BYTES", 64 * 1024 * 1024))
+
+
+class LongFlowCheckpoint:
+    """
+    Intermediate long-flow artifacts for one (video_id, summary language,
+    pipeline version): the outline and every section summary.
+
+    A rerun after a failure loads whatever is already there and only redoes
+    missing steps. A successful run clears them (the final summary lives in
+    ResultStore, the transcript in TranscriptCache).
+    """
+
+    def __init__(self, video_id: str, summary_language: str | None, store: SQLiteCache | None = None):
+        self.prefix = f"{video_id}|{summary_language or ''}|{PIPELINE_VERSION}|"
+        self.store = store if store is not None else get_checkpoint_store()
+
+    def _get(self, step: str):
+        return self.store.get_json(self.prefix + step)
+
+    def _set(self, step: str, value):
+        self.store.set_json(self.prefix + step, value)
+
+    # -----------------------
+    # Outline
+    # -----------------------
+    def load_outline(self) -> OutlineOutput | None:
+        data = self._get("outline")
+        return OutlineOutput.model_validate(data) if data is not None else None
+
+    def save_outline(self, outline: OutlineOutput):
+        self._set("outline", outline.model_dump())
+
+    # -----------------------
+    # Sections
+    # -----------------------
+    @staticmethod
+    def _section_step(section: dict) -> str:
+        # Có cả start/end → outline khác (chapters vs LLM) không dùng nhầm summary
+        return f"section|{section['section_id']}|{section['start']}|{section['end']}"
+
+    def load_section(self, section: dict) -> dict | None:
+        return self._get(self._section_step(section))
+
+    def save_section(self, summary: dict):
+        self._set(self._section_step(summary), summary)
+
+    def clear(self):
+        for key in self.store.keys(self.prefix):
+            self.store.delete(key)
+
+
+_store: SQLiteCache | None = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> SQLiteCache:
+    """Process-wide checkpoint database."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SQLiteCache(
+                CHECKPOINT_PATH,
+                table="checkpoints",
+                ttl_seconds=CHECKPOINT_TTL_SECONDS,
+                max_bytes=CHECKPOINT_MAX_BYTES,
+            )
+        return _store
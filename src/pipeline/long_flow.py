@@ -1,69 +1,238 @@
-from llm.gemini_client import GeminiClient
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+from llm.gemini_client import GeminiClient, get_gemini_client
 from preprocess.segmenter import TranscriptSegmenter
-from llm.prompts import build_outline_prompt, build_section_summary_prompt, build_global_summary_prompt
-from pipeline.video_segmentation import video_segmentation
+from preprocess.transcript_columns import TranscriptColumns
+from llm.prompts import (
+    build_outline_prompt,
+    build_section_summary_prompt,
+    build_section_summary_prompt_with_outline,
+    build_outline_context,
+    build_global_summary_prompt,
+)
+from pipeline.video_segmentation import video_segmentation, provisional_outline
 from schemas.output_format import OutlineOutput, SectionSummaryOutput, GlobalSummaryOutput
+from fetch_transcript.video_info import VideoInfo
+from pipeline.checkpoint import LongFlowCheckpoint
 import json
 
-def run_long_flow(video_id: str, transcript: str, language: str, video_duration: float = None, summary_language: str = None, **kwargs):
+
+# "parallel": sections summarized concurrently with context from the outline
+# "sequential": one by one, each prompt carries the previous summary as memory
+SECTION_SUMMARY_MODE = os.getenv("SECTION_SUMMARY_MODE", "parallel")
+SECTION_SUMMARY_CONCURRENCY = int(os.getenv("SECTION_SUMMARY_CONCURRENCY", 4))
+# Số lần thử lại riêng cho một section lỗi (ngoài retry của GeminiClient)
+SECTION_RETRY_ATTEMPTS = int(os.getenv("SECTION_RETRY_ATTEMPTS", 2))
+
+
+def _section_prompt(section: dict, output_language: str, memory: str = None, outline_context: str = None) -> str:
+    if outline_context is not None:
+        return build_section_summary_prompt_with_outline(
+            section_text=section["text"],
+            section_title=section["title"],
+            outline_context=outline_context,
+            video_language=output_language
+        )
+    return build_section_summary_prompt(
+        section_text=section["text"],
+        memory=memory or "",
+        video_language=output_language
+    )
+
+
+async def _summarize_section_async(gemini: GeminiClient, section: dict, output_language: str, memory: str = None, outline_context: str = None) -> dict:
+    summary_obj = await gemini.generate_json(
+        _section_prompt(section, output_language, memory, outline_context),
+        SectionSummaryOutput,
+        model="models/gemini-2.5-flash",
+        temperature=0.2
+    )
+
+    return {
+        "section_id": section["section_id"],
+        "title": section["title"],
+        "start": section["start"],
+        "end": section["end"],
+        "summary": summary_obj.summary,
+    }
+
+
+async def _checkpointed_section(gemini: GeminiClient, checkpoint: LongFlowCheckpoint | None, section: dict, output_language: str, memory: str = None, outline_context: str = None) -> dict:
+    """Reuse a checkpointed summary, otherwise summarize (retrying this section only) and save it."""
+    if checkpoint is not None:
+        done = checkpoint.load_section(section)
+        if done is not None:
+            return done
+
+    for attempt in range(SECTION_RETRY_ATTEMPTS + 1):
+        try:
+            summary = await _summarize_section_async(gemini, section, output_language, memory, outline_context)
+            break
+        except Exception as e:
+            if attempt == SECTION_RETRY_ATTEMPTS:
+                raise
+            print(f"[long_flow] Section {section['section_id']} failed ({e}); retry {attempt + 1}/{SECTION_RETRY_ATTEMPTS}")
+
+    if checkpoint is not None:
+        checkpoint.save_section(summary)
+    return summary
+
+
+def _summarize_section(gemini: GeminiClient, section: dict, output_language: str, memory: str = None, outline_context: str = None, checkpoint: LongFlowCheckpoint = None) -> dict:
+    return gemini.run(_checkpointed_section(gemini, checkpoint, section, output_language, memory, outline_context))
+
+
+def _summarize_parallel(gemini: GeminiClient, outlined_sections: list, outline: OutlineOutput, output_language: str, max_concurrency: int, checkpoint: LongFlowCheckpoint = None) -> list:
+    """Map step: every section at once (bounded), context from the outline."""
+    async def summarize_all() -> list:
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def summarize(idx: int) -> dict:
+            async with semaphore:
+                return await _checkpointed_section(
+                    gemini, checkpoint, outlined_sections[idx], output_language,
+                    outline_context=build_outline_context(outline.sections, idx)
+                )
+
+        # return_exceptions → các section còn lại vẫn chạy xong và được checkpoint
+        return await asyncio.gather(
+            *(summarize(idx) for idx in range(len(outlined_sections))),
+            return_exceptions=True
+        )
+
+    results = gemini.run(summarize_all())
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return results
+
+
+def _summarize_sequential(gemini: GeminiClient, outlined_sections: list, output_language: str, checkpoint: LongFlowCheckpoint = None) -> list:
+    memory = ""
+    section_summaries = []
+
+    for section in outlined_sections:
+        summary = _summarize_section(gemini, section, output_language, memory=memory, checkpoint=checkpoint)
+        section_summaries.append(summary)
+
+        # Update memory
+        memory = summary["summary"]
+
+    return section_summaries
+
+
+def _summarize_streaming(gemini: GeminiClient, segment_stream: Iterator, outline: OutlineOutput, output_language: str, mode: str, max_concurrency: int, checkpoint: LongFlowCheckpoint = None) -> list:
+    """
+    Consume ASR segments as they are produced. A section is closed once ASR
+    passes its end timestamp and summarized while later audio is still being
+    transcribed: on a single worker in sequential mode (keeps the memory
+    chain in order), on up to `max_concurrency` workers in parallel mode.
+    """
+    sections = sorted(outline.sections, key=lambda s: s.start)
+    state = {"memory": ""}
+
+    def summarize(section: dict, idx: int) -> dict:
+        if mode == "parallel":
+            return _summarize_section(
+                gemini, section, output_language,
+                outline_context=build_outline_context(sections, idx),
+                checkpoint=checkpoint
+            )
+        summary = _summarize_section(gemini, section, output_language, memory=state["memory"], checkpoint=checkpoint)
+        state["memory"] = summary["summary"]
+        return summary
+
+    def close(idx: int, texts: list):
+        sec = sections[idx]
+        section = {
+            "section_id": sec.section_id,
+            "title": sec.title,
+            "start": sec.start,
+            "end": sec.end,
+            "text": " ".join(texts).strip(),
+        }
+        print(f"[long_flow] Section {sec.section_id} closed at {sec.end:.2f}s → summarizing")
+        return pool.submit(summarize, section, idx)
+
+    workers = max(1, max_concurrency) if mode == "parallel" else 1
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="section-summary") as pool:
+        idx = 0
+        texts = []
+        for seg in segment_stream:
+            # ASR đã qua end của section hiện tại → đóng section, tóm tắt ngay
+            while idx < len(sections) - 1 and seg.start >= sections[idx].end:
+                if texts:
+                    futures.append(close(idx, texts))
+                texts = []
+                idx += 1
+            text = seg.text.strip()
+            if text:
+                texts.append(text)
+
+        if texts:
+            futures.append(close(idx, texts))
+
+        return [future.result() for future in futures]
+
+
+def run_long_flow(video_id: str, transcript: TranscriptColumns | str, language: str, video_duration: float = None, summary_language: str = None, video_info: VideoInfo = None, segment_stream: Iterator = None, mode: str = None, max_concurrency: int = None, resume: bool = True, refresh: bool = False, **kwargs):
     """
     Args:
-        transcript: Video transcript text
+        transcript: Transcript columns (or timestamped text)
         language: Video's original language
         video_duration: Duration in seconds
         summary_language: Language for summary output (defaults to video language if not provided)
+        video_info: Shared yt-dlp extraction (chapters come from it)
+        segment_stream: Streaming ASR segments; replaces `transcript` and
+            overlaps section summarization with transcription
+        mode: "parallel" (outline context, concurrent) or "sequential" (memory chain)
+        max_concurrency: Max section summaries in flight in parallel mode
+        resume: Reuse the outline / section summaries checkpointed by a failed
+            run for (video_id, summary_language); False starts from scratch
+        refresh: Recompute everything: no checkpoints (implies resume=False),
+            no shared outline, no cached LLM responses
     """
 
     # Use summary_language if provided, otherwise fallback to video language
     output_language = summary_language if summary_language else language
 
-    # ===== STEP 1: Generate outline =====
-    outline = video_segmentation(video_id, transcript, language, video_duration, summary_language)
-
-    # ===== STEP 2: Segment transcript according to outline =====
-    segmenter = TranscriptSegmenter(transcript)
-    outlined_sections = segmenter.segment_by_outline(outline.sections)
-    # ===== STEP 3: Summarize each section with memory =====
-    gemini = GeminiClient()
-    memory = ""
-    section_summaries = []
-
-    for section in outlined_sections:
-        section_text = section["text"]
+    mode = mode or SECTION_SUMMARY_MODE
+    max_concurrency = max_concurrency or SECTION_SUMMARY_CONCURRENCY
 
-        prompt = build_section_summary_prompt(
-            section_text=section_text,
-            memory=memory,
-            video_language=output_language
-        )
-        response = gemini.models.generate_content(
-        model="models/gemini-2.5-flash",
-        contents=prompt,
-        config={
-            "temperature": 0.2,
-            "response_mime_type": "application/json",
-            "response_json_schema": SectionSummaryOutput.model_json_schema(),
-        }
-    )
+    gemini = get_gemini_client()
+    if refresh:
+        gemini = gemini.fresh()
+    checkpoint = LongFlowCheckpoint(video_id, summary_language)
+    if not resume or refresh:
+        checkpoint.clear()
 
-        # ---- Parse JSON output ----
-        summary_obj = SectionSummaryOutput.model_validate_json(response.text)
+    if segment_stream is not None:
+        # ===== STEP 1-3 (streaming): outline up front, summarize as ASR advances =====
+        outline = provisional_outline(video_id, video_duration, video_info=video_info)
+        section_summaries = _summarize_streaming(gemini, segment_stream, outline, output_language, mode, max_concurrency, checkpoint)
+    else:
+        # ===== STEP 1: Generate outline =====
+        outline = checkpoint.load_outline()
+        if outline is None:
+            outline = video_segmentation(video_id, transcript, language, video_duration, summary_language, video_info=video_info, refresh=refresh)
+            checkpoint.save_outline(outline)
 
-        # Save result
-        section_summaries.append({
-            "section_id": section["section_id"],
-            "title": section["title"],
-            "start": section["start"],
-            "end": section["end"],
-            "summary": summary_obj.summary,
-        })
+        # ===== STEP 2: Segment transcript according to outline =====
+        segmenter = TranscriptSegmenter(transcript)
+        outlined_sections = segmenter.segment_by_outline(outline.sections)
 
-        # Update memory
-        memory = summary_obj.summary
-    
+        # ===== STEP 3: Summarize sections (parallel map or memory chain) =====
+        if mode == "parallel":
+            section_summaries = _summarize_parallel(gemini, outlined_sections, outline, output_language, max_concurrency, checkpoint)
+        else:
+            section_summaries = _summarize_sequential(gemini, outlined_sections, output_language, checkpoint)
 
     # ===== STEP 4: Global Summary =====
-    section_summaries_text = "" 
+    section_summaries_text = ""
     section_summaries_text = json.dumps(
         section_summaries,
         indent=2,
@@ -71,17 +240,15 @@ def run_long_flow(video_id: str, transcript: str, language: str, video_duration:
     )
     prompt = build_global_summary_prompt(
         section_summaries=section_summaries_text,
-        video_language=output_language   
+        video_language=output_language
     )
-    response = gemini.models.generate_content(
+    overall_summary = gemini.generate_json_sync(
+        prompt,
+        GlobalSummaryOutput,
         model="models/gemini-2.5-flash-lite",
-        contents=prompt,
-        config={
-            "temperature": 0.2,
-            "response_mime_type": "application/json",
-            "response_json_schema": GlobalSummaryOutput.model_json_schema(),
-        }
+        temperature=0.2
     )
-    overall_summary = GlobalSummaryOutput.model_validate_json(response.text)
+    # Chạy xong: kết quả cuối được lưu ở ResultStore → checkpoint không cần nữa
+    checkpoint.clear()
 
     return overall_summary
@@ -0,0 +1,106 @@
+import os
+import time
+import threading
+from dataclasses import dataclass
+
+from pydantic import BaseModel
+
+from fetch_transcript.youtube_fetcher import FetchResult
+from schemas.output_format import DirectSummaryOutput, GlobalSummaryOutput
+from utils.sqlite_cache import CACHE_DIR, PIPELINE_VERSION, SQLiteCache
+
+
+RESULT_STORE_PATH = os.path.join(CACHE_DIR, "results.sqlite3")
+RESULT_STORE_TTL_SECONDS = float(os.getenv("RESULT_STORE_TTL_SECONDS", 30 * 24 * 3600))
+RESULT_STORE_MAX_BYTES = int(os.getenv("RESULT_STORE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Tên schema lưu kèm kết quả → dựng lại đúng model khi đọc
+_OUTPUT_TYPES = {cls.__name__: cls for cls in (DirectSummaryOutput, GlobalSummaryOutput)}
+
+
+@dataclass
+class StoredResult:
+    result: BaseModel
+    metadata: dict
+    created_at: float
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.created_at
+
+
+class ResultStore:
+    """
+    Final summaries (DirectSummaryOutput / GlobalSummaryOutput) keyed by
+    (video_id, summary language, pipeline version), zlib-compressed JSON.
+
+    Alongside the summary it keeps the few transcript facts the entry points
+    display (title, language, duration, source), so a hit needs no network.
+    """
+
+    def __init__(
+        self,
+        path: str = RESULT_STORE_PATH,
+        ttl_seconds: float | None = RESULT_STORE_TTL_SECONDS,
+        max_bytes: int | None = RESULT_STORE_MAX_BYTES,
+        pipeline_version: str = PIPELINE_VERSION,
+    ):
+        self.store = SQLiteCache(
+            path,
+            table="results",
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+        )
+        self.pipeline_version = pipeline_version
+
+    def _key(self, video_id: str, summary_language: str | None) -> str:
+        return f"{video_id}|{summary_language or ''}|{self.pipeline_version}"
+
+    def get(self, video_id: str, summary_language: str | None) -> StoredResult | None:
+        entry = self.store.get_json(self._key(video_id, summary_language))
+        if entry is None:
+            return None
+        output_type = _OUTPUT_TYPES.get(entry["type"])
+        if output_type is None:
+            return None
+        return StoredResult(
+            result=output_type.model_validate(entry["result"]),
+            metadata=entry["metadata"],
+            created_at=entry["created_at"],
+        )
+
+    def put(self, video_id: str, summary_language: str | None, result: BaseModel, transcript: FetchResult | None = None):
+        metadata = {"video_id": video_id}
+        if transcript is not None and transcript.transcript:
+            payload = transcript.transcript
+            metadata.update({
+                "title": (transcript.metadata or {}).get("title"),
+                "language": payload.get("language"),
+                "duration_minutes": payload.get("duration", {}).get("minutes"),
+                "source": payload.get("source", "YouTube"),
+            })
+        self.store.set_json(
+            self._key(video_id, summary_language),
+            {
+                "type": type(result).__name__,
+                "result": result.model_dump(),
+                "metadata": metadata,
+                "created_at": time.time(),
+            }
+        )
+
+    def delete(self, video_id: str, summary_language: str | None):
+        self.store.delete(self._key(video_id, summary_language))
+
+
+_store: ResultStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """Process-wide result store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore()
+        return _store
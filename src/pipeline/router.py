@@ -1,66 +1,191 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from pipeline.short_flow import run_short_flow
 from pipeline.long_flow import run_long_flow
-from pipeline.audio_summary import ytb_video_to_transcript
 from utils.token_counter import estimate_tokens
-from fetch_transcript.youtube_fetcher import YouTubeTranscriptFetcher
+from fetch_transcript.youtube_fetcher import FetchResult, YouTubeTranscriptFetcher
 from llm.get_metadata import get_video_metadata
+from fetch_transcript.video_info import VideoInfo, extract_video_info
+from fetch_transcript.transcript_cache import TranscriptCache, get_transcript_cache
+from preprocess.transcript_columns import TranscriptColumns
+from preprocess.dedup import dedup_captions
 
 
 LONG_TRANSCRIPT_THRESHOLD = 1500
+# Streaming ASR: video dài hơn mức này đi long flow ngay khi ASR còn chạy
+STREAMING_LONG_VIDEO_SECONDS = 600
+# Bỏ phần lặp của caption cuộn / dòng trùng trước khi gửi LLM
+CAPTION_DEDUP = os.getenv("CAPTION_DEDUP", "1") == "1"
+
 
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
 
 
 class VideoToTextNode:
-    def __init__(self, languages=None, device="cuda"):
+    def __init__(self, languages=None, device="cuda", cache: TranscriptCache | None = None, use_cache: bool = True, stream_asr: bool = False):
         self.fetcher = YouTubeTranscriptFetcher(languages=languages)
+        self.cache = (cache or get_transcript_cache()) if use_cache else None
+        # stream_asr: ASR fallback returns a segment stream so summarization
+        # can start before transcription finishes
+        self.stream_asr = stream_asr
 
     def run(self, video_id: str):
-        # Fetch transcript
-        fetch_result = self.fetcher.fetch(video_id)
-        
+        fetch_result = self.fetch(video_id)
+        if fetch_result.ok:
+            return fetch_result
+        return self.transcribe(video_id, fetch_result)
+
+    def fetch(self, video_id: str) -> FetchResult:
+        """Network stage: YouTube transcript + video info (no ASR fallback)."""
+        # Transcript fetch and video info extraction (metadata + chapters used
+        # later by video_segmentation) are independent → run them concurrently
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="video-to-text") as pool:
+            transcript_future = pool.submit(_timed, self._fetch_transcript, video_id)
+            video_info_future = pool.submit(_timed, self._fetch_video_info, video_id)
+            fetch_result, transcript_seconds = transcript_future.result()
+            video_info, video_info_seconds = video_info_future.result()
+        wall_seconds = time.perf_counter() - wall_start
+
+        timings = {
+            "transcript_seconds": round(transcript_seconds, 3),
+            "video_info_seconds": round(video_info_seconds, 3),
+            "wall_seconds": round(wall_seconds, 3),
+            # Thời gian tiết kiệm so với chạy tuần tự
+            "saved_seconds": round(transcript_seconds + video_info_seconds - wall_seconds, 3),
+        }
+        print(
+            f"[VideoToTextNode] transcript {timings['transcript_seconds']}s | "
+            f"video info {timings['video_info_seconds']}s | "
+            f"wall {timings['wall_seconds']}s (saved {timings['saved_seconds']}s)"
+        )
+
         # Fetch video metadata (title, description, etc.)
-        metadata = get_video_metadata(video_id)
+        if video_info is not None:
+            metadata = get_video_metadata(video_id, video_info=video_info)
+        else:
+            metadata = {"video_id": video_id, "error": "Video info extraction failed"}
         fetch_result.metadata = metadata
+        fetch_result.video_info = video_info
+        fetch_result.timings = timings
         
         if fetch_result.ok:
             print(fetch_result.transcript["language"])
-            return fetch_result
+        return fetch_result
 
+    def transcribe(self, video_id: str, fetch_result: FetchResult) -> FetchResult:
+        """ASR stage: fallback for a failed `fetch`, reusing its video info."""
         print(
             f"[VideoToTextNode] Fetch failed → fallback ASR "
             f"({fetch_result.status.name})"
         )
+        video_info = fetch_result.video_info
+
+        # Import lúc cần: ASR kéo theo torch / faster_whisper (nặng, chậm)
+        from pipeline.audio_summary import ytb_video_to_transcript
 
-        asr_result = ytb_video_to_transcript(video_id)
-        asr_result.metadata = metadata  # Also attach metadata to ASR result
+        asr_result = ytb_video_to_transcript(video_id, video_info=video_info, stream=self.stream_asr)
+        if asr_result.ok and self.cache is not None:
+            if asr_result.segment_stream is not None:
+                # Giữ stream gốc: segment_stream sẽ trỏ tới wrapper (hoặc wrapper của scheduler)
+                inner = asr_result.segment_stream
+                asr_result.segment_stream = self._cache_when_done(asr_result, inner)
+            else:
+                self.cache.put(asr_result, source="ASR")
+        asr_result.metadata = fetch_result.metadata  # Also attach metadata to ASR result
+        asr_result.video_info = video_info
+        asr_result.timings = fetch_result.timings
         
         return asr_result
 
+    def _fetch_transcript(self, video_id: str) -> FetchResult:
+        # Transcript cache first: skips YouTube fetch and ASR entirely on hit
+        if self.cache is not None:
+            cached = self.cache.lookup(video_id, self.fetcher.languages)
+            if cached is not None:
+                print(f"[VideoToTextNode] Transcript cache hit for {video_id}")
+                return cached
+
+        fetch_result = self.fetcher.fetch(video_id)
+        if fetch_result.ok and self.cache is not None:
+            self.cache.put(fetch_result, source="YouTube")
+        return fetch_result
+
+    def _cache_when_done(self, asr_result: FetchResult, stream):
+        yield from stream
+        self.cache.put(asr_result, source="ASR")
+
+    def _fetch_video_info(self, video_id: str) -> VideoInfo | None:
+        # One yt-dlp extraction per video: metadata, chapters, audio format
+        try:
+            return extract_video_info(video_id)
+        except Exception as e:
+            print(f"[VideoToTextNode] Video info extraction failed: {e}")
+            return None
+
 
 class TranscriptRouter:
     def __init__(self, threshold: int = LONG_TRANSCRIPT_THRESHOLD):
         self.threshold = threshold
 
-    def route(self, video_id: str, transcript: str, summary_language: str = None, **kwargs):
+    def route(self, video_id: str, transcript: str, summary_language: str = None, resume: bool = True, refresh: bool = False, **kwargs):
         """
         Args:
             video_id: YouTube video ID
             transcript: FetchResult object containing transcript data
             summary_language: Language for summary output (defaults to video language if not provided)
+            resume: Long flow reuses checkpoints left by a failed run; False starts over
+            refresh: Recompute the summary: no checkpoints, no cached LLM responses
         """
-        token_count = estimate_tokens(transcript.transcript["text"])
+        if transcript.segment_stream is not None:
+            if transcript.transcript["duration"]["seconds"] >= STREAMING_LONG_VIDEO_SECONDS:
+                # Summarize sections while ASR is still running
+                return run_long_flow(
+                    video_id=video_id,
+                    transcript=None,
+                    language=transcript.transcript["language"],
+                    video_duration=transcript.transcript["duration"]["seconds"],
+                    summary_language=summary_language,
+                    video_info=transcript.video_info,
+                    segment_stream=transcript.segment_stream,
+                    resume=resume,
+                    refresh=refresh,
+                )
+            # Video ngắn: đợi ASR xong rồi route như bình thường
+            for _ in transcript.segment_stream:
+                pass
+        transcript.segment_stream = None
+
+        columns = TranscriptColumns.from_payload(transcript.transcript)
+        if CAPTION_DEDUP:
+            tokens_before = estimate_tokens(columns.text)
+            columns = dedup_captions(columns)
+            token_count = estimate_tokens(columns.text)
+            saved = 100 * (tokens_before - token_count) / max(1, tokens_before)
+            print(f"[router] Caption dedup: {tokens_before} → {token_count} tokens (-{saved:.1f}%)")
+        else:
+            token_count = estimate_tokens(columns.text)
 
         if token_count > self.threshold:
             return run_long_flow(
                 video_id=video_id,
-                transcript=transcript.transcript["text"],
+                transcript=columns,
                 language=transcript.transcript["language"],
                 video_duration=transcript.transcript["duration"]["seconds"],
                 summary_language=summary_language,
+                video_info=transcript.video_info,
+                resume=resume,
+                refresh=refresh,
             )
         else:
             return run_short_flow(
-                transcript=transcript.transcript["text"],
+                transcript=columns,
                 language=transcript.transcript["language"],
                 summary_language=summary_language,
+                refresh=refresh,
             )
@@ -0,0 +1,289 @@
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from fetch_transcript.youtube_fetcher import FetchResult
+
+
+# Slot mỗi stage: network rẻ → nhiều; ASR chiếm GPU/CPU → ít (1 GPU = 1 slot);
+# LLM đã có rate limit trong GeminiClient, slot giới hạn số video tóm tắt cùng lúc
+SCHEDULER_FETCH_SLOTS = int(os.getenv("SCHEDULER_FETCH_SLOTS", 8))
+SCHEDULER_ASR_SLOTS = int(os.getenv("SCHEDULER_ASR_SLOTS", 1))
+SCHEDULER_LLM_SLOTS = int(os.getenv("SCHEDULER_LLM_SLOTS", 4))
+# Số task gần nhất dùng để tính recent wait
+WAIT_WINDOW = 50
+
+
+class Stage:
+    """
+    One bounded queue + worker pool for a single kind of resource.
+    Tracks queue depth and how long tasks waited for a slot.
+    """
+
+    def __init__(self, name: str, slots: int):
+        self.name = name
+        self.slots = max(1, slots)
+        self.executor = ThreadPoolExecutor(max_workers=self.slots, thread_name_prefix=f"stage-{name}")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._recent_waits = deque(maxlen=WAIT_WINDOW)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        enqueued_at = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+
+        def task():
+            wait = time.perf_counter() - enqueued_at
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+                self._recent_waits.append(wait)
+            try:
+                return fn(*args, wait_seconds=wait, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        return self.executor.submit(task)
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self._completed + self._running
+            recent = list(self._recent_waits)
+            return {
+                "slots": self.slots,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "avg_wait_seconds": round(self._total_wait / started, 3) if started else 0.0,
+                "recent_wait_seconds": round(sum(recent) / len(recent), 3) if recent else 0.0,
+                "max_wait_seconds": round(self._max_wait, 3),
+            }
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
+
+
+@dataclass
+class VideoJob:
+    """One video moving through the scheduler; `stage` is where it is (or where it failed)."""
+    video_id: str
+    summary_language: str | None = None
+    # Tóm tắt lại từ đầu: không checkpoint, không LLM cache
+    refresh: bool = False
+    stage: str = "fetch"
+    transcript: FetchResult | None = None
+    result: Any = None
+    error: str | None = None
+    timings: dict = field(default_factory=dict)
+    started_at: float = field(default_factory=time.perf_counter)
+    # Resolves to this job when it finishes (ok or not)
+    future: Future = field(default_factory=Future, repr=False)
+    # Transcript this job fetches for other-language jobs of the same video
+    transcript_flight: Future | None = field(default=None, repr=False)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.result is not None
+
+
+class StageScheduler:
+    """
+    Hand-off pipeline across resource-specific stages:
+
+        fetch (network) ──captions──────────→ llm (summarize)
+              └──no captions──→ asr (GPU/CPU) ──┘
+
+    A job holds a slot only while it uses that resource, so one request's
+    ASR overlaps another's LLM calls instead of queueing behind it.
+    With streaming ASR the job moves on to the LLM stage once the stream
+    starts, but keeps its ASR slot until the stream is drained: decoding
+    still runs (on the LLM thread), so the next ASR job waits for it.
+    """
+
+    def __init__(
+        self,
+        fetch_slots: int = SCHEDULER_FETCH_SLOTS,
+        asr_slots: int = SCHEDULER_ASR_SLOTS,
+        llm_slots: int = SCHEDULER_LLM_SLOTS,
+    ):
+        self.stages = {
+            "fetch": Stage("fetch", fetch_slots),
+            "asr": Stage("asr", asr_slots),
+            "llm": Stage("llm", llm_slots),
+        }
+        # Slot ASR thật sự: giữ cho tới khi decode xong, kể cả khi stream được đọc ở stage llm
+        self._asr_slots = threading.BoundedSemaphore(self.stages["asr"].slots)
+        self._lock = threading.Lock()
+        self._jobs: dict[tuple, VideoJob] = {}  # (video_id, summary_language) → job in flight
+        self._transcripts: dict[str, Future] = {}  # video_id → transcript being fetched
+
+    def submit(self, job: VideoJob, node, router) -> VideoJob:
+        """
+        Run `job` through node.fetch → (node.transcribe) → router.route and
+        return the job to wait on (`job.future` resolves to it; failures are
+        recorded in `job.error` / `job.stage` instead of raised).
+
+        Single-flight: if the same (video_id, summary_language) is already
+        in flight, that running job is returned instead. A job for the same
+        video in another language waits for the running job's transcript
+        rather than fetching / transcribing it again.
+        """
+        key = (job.video_id, job.summary_language)
+        with self._lock:
+            running = self._jobs.get(key)
+            if running is not None:
+                print(f"[scheduler] {job.video_id} ({job.summary_language or 'video language'}) already in flight → joining")
+                return running
+            self._jobs[key] = job
+
+            transcript_flight = self._transcripts.get(job.video_id)
+            if transcript_flight is None:
+                job.transcript_flight = self._transcripts[job.video_id] = Future()
+
+        if transcript_flight is not None:
+            print(f"[scheduler] {job.video_id}: sharing transcript with an in-flight request")
+            job.timings["shared_transcript"] = True
+            transcript_flight.add_done_callback(lambda f: self._after_shared_transcript(job, f, router))
+        else:
+            self._hand_off(job, "fetch", self._fetch, node, router)
+        return job
+
+    def stats(self) -> dict:
+        return {name: stage.stats() for name, stage in self.stages.items()}
+
+    def format_stats(self) -> str:
+        return " | ".join(
+            f"{name}: {s['running']}/{s['slots']} running, {s['queued']} queued, "
+            f"wait avg {s['avg_wait_seconds']}s"
+            for name, s in self.stats().items()
+        )
+
+    def shutdown(self, wait: bool = True):
+        for stage in self.stages.values():
+            stage.shutdown(wait=wait)
+
+    # ---------- Stages ----------
+    # Mỗi stage trả về bước kế tiếp (stage, fn, *args) hoặc None nếu job đã xong
+
+    def _hand_off(self, job: VideoJob, stage: str, fn, *args):
+        job.stage = stage
+
+        def run(wait_seconds: float):
+            job.timings[f"{stage}_wait_seconds"] = round(wait_seconds, 3)
+            start = time.perf_counter()
+            try:
+                next_step = fn(job, *args)
+            except Exception as e:
+                job.error = str(e)
+                next_step = None
+            job.timings[f"{stage}_seconds"] = round(time.perf_counter() - start, 3)
+
+            if next_step is None:
+                self._finish(job)
+            else:
+                self._hand_off(job, *next_step)
+
+        self.stages[stage].submit(run)
+
+    def _finish(self, job: VideoJob):
+        job.timings["total_seconds"] = round(time.perf_counter() - job.started_at, 3)
+        # Transcript chưa publish (lỗi, hoặc streaming ASR vừa drain xong) → publish ngay
+        self._publish_transcript(job)
+        with self._lock:
+            if self._jobs.get((job.video_id, job.summary_language)) is job:
+                del self._jobs[(job.video_id, job.summary_language)]
+        job.future.set_result(job)
+
+    def _publish_transcript(self, job: VideoJob):
+        flight = job.transcript_flight
+        if flight is None or flight.done():
+            return
+        with self._lock:
+            if self._transcripts.get(job.video_id) is flight:
+                del self._transcripts[job.video_id]
+        if job.transcript is not None and job.transcript.ok:
+            if job.transcript.segment_stream is not None:
+                # Job đã xong nên không còn ai đọc stream → drain nốt cho transcript đầy đủ
+                for _ in job.transcript.segment_stream:
+                    pass
+            flight.set_result(job.transcript)
+        else:
+            flight.set_exception(RuntimeError(job.error or "transcript unavailable"))
+
+    def _after_shared_transcript(self, job: VideoJob, flight: Future, router):
+        try:
+            # Bản copy nông, transcript đã đầy đủ (không stream)
+            job.transcript = replace(flight.result(), segment_stream=None)
+        except Exception as e:
+            job.error = str(e)
+            return self._finish(job)
+        self._hand_off(job, "llm", self._summarize, router)
+
+    def _fetch(self, job: VideoJob, node, router):
+        job.transcript = node.fetch(job.video_id)
+        if job.transcript.ok:
+            self._publish_transcript(job)
+            return "llm", self._summarize, router
+        return "asr", self._transcribe, node, router
+
+    def _transcribe(self, job: VideoJob, node, router):
+        self._asr_slots.acquire()
+        try:
+            job.transcript = node.transcribe(job.video_id, job.transcript)
+        except BaseException:
+            self._asr_slots.release()
+            raise
+        stream = job.transcript.segment_stream if job.transcript.ok else None
+        if stream is None:
+            self._asr_slots.release()
+        else:
+            job.transcript.segment_stream = self._holding_asr_slot(stream)
+
+        if not job.transcript.ok:
+            job.error = job.transcript.error or "ASR failed"
+            return None
+        # Streaming ASR: transcript chỉ đầy đủ sau khi router drain stream → publish lúc job xong
+        if job.transcript.segment_stream is None:
+            self._publish_transcript(job)
+        return "llm", self._summarize, router
+
+    def _holding_asr_slot(self, stream):
+        """Yield from a streaming ASR iterator; the ASR slot is released once it is drained."""
+        try:
+            yield from stream
+        finally:
+            self._asr_slots.release()
+
+    def _summarize(self, job: VideoJob, router):
+        job.result = router.route(
+            job.video_id, job.transcript,
+            summary_language=job.summary_language,
+            refresh=job.refresh,
+        )
+        return None
+
+
+_scheduler: StageScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> StageScheduler:
+    """Process-wide scheduler shared by concurrent requests (app.py)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = StageScheduler()
+        return _scheduler
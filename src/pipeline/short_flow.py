@@ -1,16 +1,20 @@
-from llm.gemini_client import GeminiClient
+from llm.gemini_client import get_gemini_client
 from llm.prompts import build_direct_summary_prompt
+from preprocess.transcript_columns import TranscriptColumns
 from schemas.output_format import DirectSummaryOutput
 
 
-def run_short_flow(transcript: str, language: str = "English", summary_language: str = None, **kwargs):
+def run_short_flow(transcript: TranscriptColumns | str, language: str = "English", summary_language: str = None, refresh: bool = False, **kwargs):
     """
     Args:
-        transcript: Video transcript text
+        transcript: Transcript columns (or timestamped text)
         language: Video's original language
         summary_language: Language for summary output (defaults to video language if not provided)
+        refresh: Ignore cached LLM responses
     """
-    gemini = GeminiClient()
+    gemini = get_gemini_client()
+    if refresh:
+        gemini = gemini.fresh()
     
     # Use summary_language if provided, otherwise fallback to video language
     output_language = summary_language if summary_language else language
@@ -21,15 +25,11 @@ def run_short_flow(transcript: str, language: str = "English", summary_language:
         video_language=output_language
     )
 
-    response = gemini.models.generate_content(
+    summary_obj = gemini.generate_json_sync(
+        prompt,
+        DirectSummaryOutput,
         model="models/gemini-2.5-flash",
-        contents=prompt,
-        config={
-            "temperature": 0.2,
-            "response_mime_type": "application/json",
-            "response_json_schema": DirectSummaryOutput.model_json_schema(),
-        }
+        temperature=0.2
     )
-    summary_obj = DirectSummaryOutput.model_validate_json(response.text)
 
     return summary_obj
@@ -1,15 +1,62 @@
+import os
+
 from fetch_transcript.get_chapters import get_youtube_chapters
-from llm.gemini_client import GeminiClient
-from llm.prompts import build_outline_prompt
-from schemas.output_format import OutlineOutput
+from fetch_transcript.video_info import VideoInfo
+from llm.gemini_client import get_gemini_client
+from llm.prompts import build_outline_prompt, target_section_range
+from preprocess.topic_segmenter import local_outline
+from preprocess.transcript_columns import TranscriptColumns
+from schemas.output_format import OutlineOutput, SectionOutline
+from utils.single_flight import SingleFlight
+
+
+# "llm": always ask Gemini for the outline (titles in the summary language)
+# "local": TextTiling segmenter, LLM only when it cannot segment; titles are
+#          "Part N: keywords" in the transcript's language → chỉ dùng khi cần tiết kiệm
+OUTLINE_MODE = os.getenv("OUTLINE_MODE", "llm")
+# Giữ outline đã xong thêm một khoảng cho request cùng video + ngôn ngữ (0 = chỉ chia sẻ khi đang chạy)
+OUTLINE_SHARE_SECONDS = float(os.getenv("OUTLINE_SHARE_SECONDS", 0))
+
+_outline_flight = SingleFlight(linger_seconds=OUTLINE_SHARE_SECONDS)
+
 
-def video_segmentation(video_id: str, transcript: str, language: str, video_duration: float = None, summary_language: str = None, **kwargs):
-    # Get chapters if available
-    chapters = get_youtube_chapters(video_id)
+def video_segmentation(video_id: str, transcript: TranscriptColumns | str, language: str, video_duration: float = None, summary_language: str = None, video_info: VideoInfo = None, refresh: bool = False, **kwargs):
+    """
+    Outline for a video: chapters, local topic segmentation or LLM.
+
+    Concurrent requests for the same video and output language share one
+    outline; LLM section titles are written in that language, so other
+    languages build their own. `refresh` builds a new one, ignoring
+    shared outlines and cached LLM responses.
+    """
+    if refresh:
+        return _build_outline(video_id, transcript, language, video_duration, summary_language, video_info, refresh=True)
+
+    output_language = summary_language if summary_language else language
+    outline, shared = _outline_flight.do(
+        (video_id, output_language), _build_outline, video_id, transcript, language,
+        video_duration, summary_language, video_info,
+    )
+    if shared:
+        print(f"[video_segmentation] Reusing outline of a concurrent request for {video_id} ({output_language})")
+    return outline
+
+
+def _build_outline(video_id: str, transcript: TranscriptColumns | str, language: str, video_duration: float = None, summary_language: str = None, video_info: VideoInfo = None, refresh: bool = False):
+    # Get chapters if available (reuse the shared extraction when given)
+    chapters = get_youtube_chapters(video_id, video_info=video_info)
     if chapters:
         return chapters
     
-    # Fallback: LLM segmentation if no chapters
+    # No chapters: local topic segmentation (no LLM round-trip)
+    if OUTLINE_MODE == "local":
+        outline = local_outline(transcript, video_duration)
+        if outline is not None:
+            print(f"[video_segmentation] Local outline: {len(outline.sections)} sections")
+            return outline
+        print("[video_segmentation] Local outline unavailable → LLM outline")
+
+    # Fallback: LLM segmentation
     # Use summary_language if provided, otherwise fallback to video language
     output_language = summary_language if summary_language else language
 
@@ -19,15 +66,38 @@ def video_segmentation(video_id: str, transcript: str, language: str, video_dura
         video_language=output_language,
         video_duration=video_duration,
     )
-    gemini = GeminiClient()
-    response = gemini.models.generate_content(
+    gemini = get_gemini_client()
+    if refresh:
+        gemini = gemini.fresh()
+    outline = gemini.generate_json_sync(
+        prompt,
+        OutlineOutput,
         model="models/gemini-2.5-flash",
-        contents=prompt,
-        config={
-            "temperature": 0.0,
-            "response_mime_type": "application/json",
-            "response_json_schema": OutlineOutput.model_json_schema(),
-        }
+        temperature=0.0
     )
-    outline = OutlineOutput.model_validate_json(response.text)
-    return outline
\ No newline at end of file
+    return outline
+
+
+def provisional_outline(video_id: str, video_duration: float, video_info: VideoInfo = None) -> OutlineOutput:
+    """
+    Outline known before the transcript exists (streaming ASR):
+    YouTube chapters if any, otherwise equal-length parts sized by the
+    section-count targets of OUTLINE_PROMPT.
+    """
+    chapters = get_youtube_chapters(video_id, video_info=video_info)
+    if chapters:
+        return chapters
+
+    low, high = target_section_range(video_duration)
+    count = max(1, (low + high) // 2)
+    step = video_duration / count
+    return OutlineOutput(sections=[
+        SectionOutline(
+            section_id=i + 1,
+            title=f"Part {i + 1}",
+            start=round(i * step, 2),
+            end=round(video_duration if i == count - 1 else (i + 1) * step, 2),
+            keywords=[]
+        )
+        for i in range(count)
+    ])
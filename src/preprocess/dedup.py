@@ -0,0 +1,55 @@
+import string
+
+from preprocess.transcript_columns import TranscriptColumns
+
+
+PUNCTUATION = string.punctuation + "…“”‘’«»"
+
+
+def _normalize(words: list[str]) -> list[str]:
+    return [w.lower().strip(PUNCTUATION) for w in words]
+
+
+def _overlap(prev: list[str], cur: list[str], min_words: int, max_words: int) -> int:
+    """Longest k (>= min_words) such that the last k words of prev == the first k of cur."""
+    for k in range(min(len(prev), len(cur), max_words), min_words - 1, -1):
+        if prev[-k:] == cur[:k]:
+            return k
+    return 0
+
+
+def dedup_captions(columns: TranscriptColumns, min_overlap: int = 2, max_overlap: int = 30) -> TranscriptColumns:
+    """
+    Remove rolling-caption repetition:
+
+    - the longest n-gram (>= `min_overlap` words) that ends the previous
+      caption and starts the current one is cut from the current caption;
+    - a caption identical to the previous one (case/punctuation-insensitive),
+      or fully covered by the overlap, is dropped and the kept caption's
+      duration extended, so runs keep their first timestamp.
+
+    Comparisons use the previous caption as it was before trimming.
+    """
+    starts, durations, texts = [], [], []
+    prev_norm: list[str] = []
+
+    for start, duration, text in zip(columns.start.tolist(), columns.duration.tolist(), columns.texts()):
+        words = text.split()
+        norm = _normalize(words)
+
+        if norm == prev_norm:
+            cut = len(words)
+        else:
+            cut = _overlap(prev_norm, norm, min_overlap, max_overlap)
+        prev_norm = norm
+
+        if cut == len(words) and texts:
+            # Trùng hoàn toàn → bỏ, giữ timestamp đầu tiên của chuỗi lặp
+            durations[-1] = max(durations[-1], start + duration - starts[-1])
+            continue
+
+        starts.append(start)
+        durations.append(duration)
+        texts.append(" ".join(words[cut:]) if cut else text)
+
+    return TranscriptColumns.from_segments(starts, durations, texts)
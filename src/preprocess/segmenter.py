@@ -1,81 +1,75 @@
-import re
 from typing import List, Dict
 
+import numpy as np
+
+from preprocess.transcript_columns import TranscriptColumns
+
 
 class TranscriptSegmenter:
     """
-    1. Parse transcript string with timestamps
-    2. Segment transcript based on outline
+    1. Index the transcript columns: sorted start/end arrays and offsets
+       into the single text buffer
+    2. Segment transcript based on outline with binary search
     """
 
-    TIMESTAMP_PATTERN = re.compile(r"\[(\d+(?:\.\d+)?)s\]")
-
-    def __init__(self, transcript_text: str):
-        self.raw_text = transcript_text
-        self.segments = self._parse_transcript()
-
-    # ---------- STEP 1: PARSE ----------
-
-    def _parse_transcript(self) -> List[Dict]:
-        """
-        Convert:
-        "[8.96s] hello [10.92s] world"
-        →
-        [
-          {"start": 8.96, "end": 10.92, "text": "hello"},
-          {"start": 10.92, "end": None, "text": "world"}
+    def __init__(self, transcript: TranscriptColumns | str):
+        if isinstance(transcript, str):
+            # Chuỗi "[12.34s] text ..." kiểu cũ
+            transcript = TranscriptColumns.from_timestamped(transcript)
+        self.columns = transcript
+        self.buffer = transcript.text
+        self.starts = transcript.start
+        # Segment kéo dài tới khi segment kế tiếp bắt đầu
+        self.ends = np.append(transcript.start[1:], np.inf) if len(transcript) else np.zeros(0)
+        self.begins = transcript.offsets
+        self.stops = transcript.stops
+
+    @property
+    def texts(self) -> List[str]:
+        return list(self.columns.texts())
+
+    @property
+    def segments(self) -> List[Dict]:
+        """Per-segment dicts ({"start", "end", "text"}; last end is None)."""
+        return [
+            {"start": float(start), "end": None if np.isinf(end) else float(end), "text": text}
+            for start, end, text in zip(self.starts, self.ends, self.texts)
         ]
-        """
-        matches = list(self.TIMESTAMP_PATTERN.finditer(self.raw_text))
-        segments = []
-
-        for i, match in enumerate(matches):
-            start_time = float(match.group(1))
-            start_idx = match.end()
 
-            if i + 1 < len(matches):
-                end_time = float(matches[i + 1].group(1))
-                end_idx = matches[i + 1].start()
-            else:
-                end_time = None
-                end_idx = len(self.raw_text)
+    def __len__(self) -> int:
+        return len(self.columns)
 
-            text = self.raw_text[start_idx:end_idx].strip()
-
-            if text:
-                segments.append({
-                    "start": start_time,
-                    "end": end_time,
-                    "text": text
-                })
+    # ---------- STEP 2: SEGMENT BY OUTLINE ----------
 
-        return segments
+    def span(self, start: float, end: float) -> tuple[int, int]:
+        """Segment index range [lo, hi) overlapping the time range [start, end)."""
+        lo = int(np.searchsorted(self.ends, start, side="right"))
+        hi = int(np.searchsorted(self.starts, end, side="left"))
+        return lo, max(lo, hi)
 
-    # ---------- STEP 2: SEGMENT BY OUTLINE ----------
+    def text_between(self, lo: int, hi: int) -> str:
+        if lo >= hi:
+            return ""
+        return self.buffer[self.begins[lo]:self.stops[hi - 1]]
 
     def segment_by_outline(self, outline) -> List[Dict]:
         """
         outline: List[SectionOutline]
         """
-        sections = []
-
-        for sec in outline:
-            texts = []
-
-            for seg in self.segments:
-                if seg["end"] is not None and seg["end"] <= sec.start:
-                    continue
-                if seg["start"] >= sec.end:
-                    break
-
-                texts.append(seg["text"])
+        sec_starts = np.fromiter((sec.start for sec in outline), dtype=np.float64, count=len(outline))
+        sec_ends = np.fromiter((sec.end for sec in outline), dtype=np.float64, count=len(outline))
+        # Tìm nhị phân cho tất cả section trong một lần gọi
+        los = np.searchsorted(self.ends, sec_starts, side="right")
+        his = np.searchsorted(self.starts, sec_ends, side="left")
 
+        sections = []
+        for sec, lo, hi in zip(outline, los, his):
             sections.append({
                 "section_id": sec.section_id,
                 "title": sec.title,
                 "start": sec.start,
                 "end": sec.end,
-                "text": " ".join(texts).strip()
+                "text": self.text_between(int(lo), int(hi))
             })
 
         return sections
@@ -0,0 +1,197 @@
+import math
+import re
+from typing import List, Optional
+
+import numpy as np
+
+from llm.prompts import target_section_range
+from preprocess.segmenter import TranscriptSegmenter
+from preprocess.transcript_columns import TranscriptColumns
+from schemas.output_format import OutlineOutput, SectionOutline
+
+
+# Chữ cái Unicode (giữ được tiếng Việt), bỏ số và dấu câu
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+# Giới hạn kích thước ma trận đếm: n_pseudo_sentences × vocabulary
+MAX_PSEUDO_SENTENCES = 2000
+MAX_VOCABULARY = 3000
+
+
+class TopicSegmenter:
+    """
+    TextTiling-style topic segmentation of a timestamped transcript.
+
+    1. Tokens are grouped into pseudo-sentences of `sentence_words` words.
+    2. Lexical cohesion at every gap = cosine similarity between the term
+       counts of the `block_size` pseudo-sentences on each side (cumulative
+       sums → all gaps in one vectorized pass).
+    3. Depth score of each similarity valley; the deepest valleys become
+       section boundaries, as many as `target_section_range` allows.
+
+    Terms present in more than `max_block_df` of pseudo-sentences are
+    treated as stop words, so no language-specific list is needed.
+    """
+
+    def __init__(
+        self,
+        sentence_words: int = 20,
+        block_size: int = 6,
+        smoothing: int = 3,
+        max_block_df: float = 0.5,
+        keywords_per_section: int = 5,
+    ):
+        self.sentence_words = sentence_words
+        self.block_size = block_size
+        self.smoothing = smoothing
+        self.max_block_df = max_block_df
+        self.keywords_per_section = keywords_per_section
+
+    # ---------- Tokens & pseudo-sentences ----------
+
+    def _tokenize(self, segmenter: TranscriptSegmenter):
+        words, times = [], []
+        for start, text in zip(segmenter.starts, segmenter.columns.texts()):
+            tokens = WORD_PATTERN.findall(text.lower())
+            words.extend(tokens)
+            times.extend([start] * len(tokens))
+        return words, np.asarray(times, dtype=np.float64)
+
+    def _count_matrix(self, words: List[str], sentence_words: int):
+        vocab, ids = np.unique(np.asarray(words), return_inverse=True)
+        ids = ids.ravel()
+
+        # Chỉ giữ các từ phổ biến nhất → ma trận không phình theo độ dài video
+        freq = np.bincount(ids, minlength=len(vocab))
+        keep = np.argsort(freq)[::-1][:MAX_VOCABULARY]
+        remap = np.full(len(vocab), -1)
+        remap[keep] = np.arange(len(keep))
+
+        rows = np.arange(len(ids)) // sentence_words
+        cols = remap[ids]
+        mask = cols >= 0
+        n_rows = int(rows[-1]) + 1
+        counts = np.bincount(
+            rows[mask] * len(keep) + cols[mask],
+            minlength=n_rows * len(keep)
+        ).reshape(n_rows, len(keep)).astype(np.float32)
+
+        # Bỏ "stop word": xuất hiện trong quá nửa số pseudo-sentence
+        block_df = (counts > 0).mean(axis=0)
+        content = block_df <= self.max_block_df
+        return counts[:, content], vocab[keep][content]
+
+    # ---------- Cohesion & depth ----------
+
+    def _gap_scores(self, counts: np.ndarray) -> np.ndarray:
+        """Cosine similarity across every gap i (between rows i-1 and i), i = 1..n-1."""
+        n = len(counts)
+        k = self.block_size
+        cum = np.vstack([np.zeros((1, counts.shape[1]), dtype=np.float32), np.cumsum(counts, axis=0)])
+        gaps = np.arange(1, n)
+        left = cum[gaps] - cum[np.maximum(gaps - k, 0)]
+        right = cum[np.minimum(gaps + k, n)] - cum[gaps]
+
+        dot = np.einsum("ij,ij->i", left, right)
+        norm = np.linalg.norm(left, axis=1) * np.linalg.norm(right, axis=1)
+        scores = np.divide(dot, norm, out=np.zeros_like(dot), where=norm > 0)
+
+        if self.smoothing > 1:
+            kernel = np.ones(self.smoothing) / self.smoothing
+            scores = np.convolve(np.pad(scores, self.smoothing // 2, mode="edge"), kernel, mode="valid")
+        return scores
+
+    def _depth_scores(self, scores: np.ndarray) -> np.ndarray:
+        """(highest score to the left − score) + (highest score to the right − score) within a block."""
+        reach = self.block_size
+        padded = np.pad(scores, reach, mode="edge")
+        windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * reach + 1)
+        left_peak = windows[:, : reach + 1].max(axis=1)
+        right_peak = windows[:, reach:].max(axis=1)
+        return (left_peak - scores) + (right_peak - scores)
+
+    @staticmethod
+    def _valleys(depths: np.ndarray) -> np.ndarray:
+        """Gaps whose depth is a local maximum (the bottom of a similarity valley)."""
+        padded = np.pad(depths, 1, mode="constant", constant_values=-np.inf)
+        is_peak = (depths >= padded[:-2]) & (depths > padded[2:]) & (depths > 0)
+        return np.flatnonzero(is_peak)
+
+    @staticmethod
+    def _pick_boundaries(depths: np.ndarray, valleys: np.ndarray, gap_times: np.ndarray, count: int, min_separation: float) -> List[int]:
+        chosen: List[int] = []
+        for gap in valleys[np.argsort(depths[valleys])[::-1]]:
+            if len(chosen) == count:
+                break
+            if all(abs(gap_times[gap] - gap_times[other]) >= min_separation for other in chosen):
+                chosen.append(int(gap))
+        return sorted(chosen)
+
+    # ---------- Keywords ----------
+
+    def _keywords(self, counts: np.ndarray, vocab: np.ndarray, bounds: List[int]) -> List[List[str]]:
+        section_counts = np.add.reduceat(counts, bounds[:-1], axis=0)
+        df = (section_counts > 0).sum(axis=0)
+        idf = np.log((1 + len(bounds) - 1) / (1 + df)) + 1
+        scores = section_counts * idf
+        top = np.argsort(scores, axis=1)[:, ::-1][:, : self.keywords_per_section]
+        return [
+            [str(vocab[j]) for j in row if section_counts[i, j] > 0]
+            for i, row in enumerate(top)
+        ]
+
+    # ---------- Public API ----------
+
+    def segment(self, transcript: TranscriptColumns | str, video_duration: Optional[float] = None) -> Optional[OutlineOutput]:
+        """
+        Outline from transcript columns (or a "[12.34s] text ..." string),
+        or None when there is too little timestamped text to find topic shifts.
+        """
+        segmenter = TranscriptSegmenter(transcript)
+        if not len(segmenter):
+            return None
+
+        words, times = self._tokenize(segmenter)
+        sentence_words = max(self.sentence_words, math.ceil(len(words) / MAX_PSEUDO_SENTENCES))
+        if len(words) < sentence_words * (2 * self.block_size + 1):
+            return None
+
+        counts, vocab = self._count_matrix(words, sentence_words)
+        if counts.shape[1] == 0:
+            return None
+
+        duration = video_duration or float(times[-1])
+        low, high = target_section_range(duration)
+
+        scores = self._gap_scores(counts)
+        depths = self._depth_scores(scores)
+        # Gap i nằm trước pseudo-sentence i+1 → thời điểm bắt đầu của nó
+        gap_times = times[np.arange(1, len(counts)) * sentence_words]
+
+        # Số section: valley sâu hơn mean + std của các valley (ưu tiên ít section), kẹp vào [low, high]
+        valleys = self._valleys(depths)
+        if len(valleys) == 0:
+            return None
+        valley_depths = depths[valleys]
+        cutoff = valley_depths.mean() + valley_depths.std()
+        count = min(max(int((valley_depths > cutoff).sum()) + 1, low), high)
+        gaps = self._pick_boundaries(depths, valleys, gap_times, count - 1, min_separation=duration / (2 * high))
+
+        bounds = [0] + [gap + 1 for gap in gaps] + [len(counts)]
+        cuts = [0.0] + [round(float(gap_times[gap]), 2) for gap in gaps] + [round(float(duration), 2)]
+        keywords = self._keywords(counts, vocab, bounds)
+
+        return OutlineOutput(sections=[
+            SectionOutline(
+                section_id=i + 1,
+                title=f"Part {i + 1}: {', '.join(keywords[i][:3])}" if keywords[i] else f"Part {i + 1}",
+                start=cuts[i],
+                end=cuts[i + 1],
+                keywords=keywords[i]
+            )
+            for i in range(len(cuts) - 1)
+        ])
+
+
+def local_outline(transcript: TranscriptColumns | str, video_duration: Optional[float] = None) -> Optional[OutlineOutput]:
+    return TopicSegmenter().segment(transcript, video_duration)
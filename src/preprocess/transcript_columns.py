@@ -0,0 +1,114 @@
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+import numpy as np
+
+
+SEPARATOR = " "
+TIMESTAMP_PATTERN = re.compile(r"\[(\d+(?:\.\d+)?)s\]")
+
+
+@dataclass
+class TranscriptColumns:
+    """
+    Columnar transcript: parallel `start` / `duration` arrays plus the offset
+    of each segment's text inside one string (segments joined by a space).
+
+    Stored in the payload as `payload["text"]` + `payload["columns"]`, so
+    segmenting and prompt building never re-parse "[12.34s]" markers.
+    """
+
+    text: str
+    start: np.ndarray
+    duration: np.ndarray
+    offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def stops(self) -> np.ndarray:
+        """End offset of each segment's text (exclusive)."""
+        if not len(self.offsets):
+            return np.zeros(0, dtype=np.int64)
+        return np.append(self.offsets[1:] - len(SEPARATOR), len(self.text)).astype(np.int64)
+
+    def texts(self) -> Iterator[str]:
+        for begin, stop in zip(self.offsets.tolist(), self.stops.tolist()):
+            yield self.text[begin:stop]
+
+    def timestamped(self, interval: float = 0.0, precision: int = 2, sentence_boundaries: bool = False) -> str:
+        """
+        Render as "[12.34s] text [15.02s] text ..." for prompts that need timestamps.
+
+        interval: emit a marker only once at least this many seconds have
+            passed since the last one (0 = every segment)
+        precision: decimals in the marker ("[123s]" with 0)
+        sentence_boundaries: also emit a marker when the previous segment
+            ended a sentence
+        """
+        parts = []
+        last_marked = -np.inf
+        prev_text = ""
+        for start, text in zip(self.start.tolist(), self.texts()):
+            at_sentence = sentence_boundaries and prev_text[-1:] in (".", "!", "?")
+            if start - last_marked >= interval or at_sentence:
+                parts.append(f"[{start:.{precision}f}s] {text}")
+                last_marked = start
+            else:
+                parts.append(text)
+            prev_text = text
+        return SEPARATOR.join(parts)
+
+    # ---------- Build ----------
+
+    @classmethod
+    def from_segments(cls, starts: Iterable[float], durations: Iterable[float], texts: Iterable[str]) -> "TranscriptColumns":
+        """Segments with empty text are dropped."""
+        kept = [
+            (start, duration, text)
+            for start, duration, text in zip(starts, durations, texts)
+            if text
+        ]
+        lengths = np.fromiter((len(text) for _, _, text in kept), dtype=np.int64, count=len(kept))
+        return cls(
+            text=SEPARATOR.join(text for _, _, text in kept),
+            start=np.fromiter((s for s, _, _ in kept), dtype=np.float64, count=len(kept)),
+            duration=np.fromiter((d for _, d, _ in kept), dtype=np.float64, count=len(kept)),
+            offsets=np.cumsum(lengths + len(SEPARATOR)) - lengths - len(SEPARATOR),
+        )
+
+    @classmethod
+    def from_timestamped(cls, text: str) -> "TranscriptColumns":
+        """Parse a "[12.34s] text ..." string (payloads cached before columns existed)."""
+        matches = list(TIMESTAMP_PATTERN.finditer(text))
+        times = [float(m.group(1)) for m in matches]
+        bounds = [m.start() for m in matches[1:]] + [len(text)]
+        return cls.from_segments(
+            times,
+            [times[i + 1] - times[i] if i + 1 < len(times) else 0.0 for i in range(len(times))],
+            [text[m.end():bounds[i]].strip() for i, m in enumerate(matches)],
+        )
+
+    # ---------- Payload (JSON) ----------
+
+    def to_dict(self) -> dict:
+        return {
+            "start": self.start.tolist(),
+            "duration": self.duration.tolist(),
+            "offsets": self.offsets.tolist(),
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "TranscriptColumns":
+        columns = payload.get("columns")
+        if columns is None:
+            # Payload cũ (cache trước columns): timestamp nằm trong text (YouTube) hoặc raw_text (ASR)
+            return cls.from_timestamped(payload.get("raw_text") or payload.get("text", ""))
+        return cls(
+            text=payload["text"],
+            start=np.asarray(columns["start"], dtype=np.float64),
+            duration=np.asarray(columns["duration"], dtype=np.float64),
+            offsets=np.asarray(columns["offsets"], dtype=np.int64),
+        )
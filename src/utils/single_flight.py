@@ -0,0 +1,57 @@
+import time
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key: the first caller runs the
+    function, the others block until it finishes and get the same result
+    (or exception).
+
+    linger_seconds: keep a successful result this long after it completes,
+    so callers arriving just after the leader also reuse it (0 = in-flight only).
+    """
+
+    def __init__(self, linger_seconds: float = 0.0):
+        self.linger_seconds = linger_seconds
+        self._lock = threading.Lock()
+        self._calls: dict = {}  # key → (Future, expires_at | None)
+
+    def do(self, key, fn, *args, **kwargs) -> tuple:
+        """Return (result, shared); `shared` is True when another caller computed it."""
+        with self._lock:
+            entry = self._calls.get(key)
+            if entry is not None and entry[1] is not None and entry[1] < time.monotonic():
+                del self._calls[key]
+                entry = None
+            if entry is None:
+                future = Future()
+                self._calls[key] = (future, None)
+                leader = True
+            else:
+                future = entry[0]
+                leader = False
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if self.linger_seconds > 0:
+                self._calls[key] = (future, time.monotonic() + self.linger_seconds)
+                # Dọn các kết quả đã hết hạn
+                now = time.monotonic()
+                for stale in [k for k, (_, expires) in self._calls.items() if expires is not None and expires < now]:
+                    del self._calls[stale]
+            else:
+                del self._calls[key]
+        future.set_result(result)
+        return result, False
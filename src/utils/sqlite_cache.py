@@ -0,0 +1,150 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+
+# Thư mục chung cho các cache trên đĩa (transcript, ...)
+CACHE_DIR = os.getenv("YTB_CACHE_DIR", "cache")
+# Tăng khi prompt / schema / flow thay đổi → kết quả, checkpoint và LLM response cũ không còn được dùng
+PIPELINE_VERSION = os.getenv("PIPELINE_VERSION", "1")
+
+
+class SQLiteCache:
+    """
+    Small key → blob store on SQLite with TTL and a total-size cap.
+
+    - Entries older than `ttl_seconds` are treated as missing and purged.
+    - When the total stored bytes exceed `max_bytes`, the least recently
+      accessed entries are evicted (LRU).
+    Safe to share between threads (one connection guarded by a lock).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "cache",
+        ttl_seconds: float | None = None,
+        max_bytes: int | None = None,
+    ):
+        self.path = path
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, "
+                "value BLOB NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_last_access "
+                f"ON {table}(last_access)"
+            )
+
+    # -----------------------
+    # Raw bytes API
+    # -----------------------
+    def get(self, key: str) -> bytes | None:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return None
+
+            self._conn.execute(
+                f"UPDATE {self.table} SET last_access = ? WHERE key = ?",
+                (now, key)
+            )
+            return value
+
+    def set(self, key: str, value: bytes):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} "
+                "(key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now)
+            )
+            self._evict(now)
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def keys(self, prefix: str = "") -> list[str]:
+        # Escape ký tự đặc biệt của LIKE trong prefix
+        pattern = (
+            prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        )
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key FROM {self.table} WHERE key LIKE ? ESCAPE '\\'",
+                (pattern,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # -----------------------
+    # JSON API (zlib-compressed)
+    # -----------------------
+    def get_json(self, key: str):
+        value = self.get(key)
+        if value is None:
+            return None
+        return json.loads(zlib.decompress(value))
+
+    def set_json(self, key: str, obj):
+        data = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+        self.set(key, zlib.compress(data.encode("utf-8")))
+
+    # -----------------------
+    # Eviction
+    # -----------------------
+    def _evict(self, now: float):
+        """Caller must hold the lock and an open transaction."""
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?",
+                (now - self.ttl_seconds,)
+            )
+
+        if self.max_bytes is None:
+            return
+
+        total = self._conn.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM {self.table}"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        victims = []
+        for key, size in self._conn.execute(
+            f"SELECT key, size FROM {self.table} ORDER BY last_access ASC"
+        ):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+# Code nằm trong src/; benchmarks/ giữ reference implementation (legacy cleaner)
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
@@ -0,0 +1,40 @@
+"""
+The captioned-video path must not import the ASR stack: torch and
+faster_whisper are only loaded when a video has no captions.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+ASR_MODULES = ["torch", "faster_whisper"]
+
+# Chạy trong interpreter mới: sys.modules của pytest đã có thể chứa torch
+IMPORT_CHECK = """
+import sys, json
+sys.path.insert(0, {root!r})
+sys.path.insert(0, {src!r})
+import {module}
+print(json.dumps([m for m in {modules!r} if m in sys.modules]))
+"""
+
+
+def loaded_after_import(module: str) -> list[str]:
+    proc = subprocess.run(
+        [sys.executable, "-c", IMPORT_CHECK.format(root=str(ROOT), src=str(ROOT / "src"), module=module, modules=ASR_MODULES)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", ["pipeline.router", "main"])
+def test_import_does_not_load_asr_stack(module):
+    assert loaded_after_import(module) == []
@@ -0,0 +1,33 @@
+"""
+Golden check: the single-pass caption cleaner renders exactly what the
+original whole-string cleaner (kept in benchmarks/bench_transcript_cleaner.py)
+produced.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from bench_transcript_cleaner import SAMPLES, legacy_pipeline, synthetic_segments
+from fetch_transcript.youtube_fetcher import YouTubeTranscriptFetcher
+
+
+@pytest.fixture(scope="module")
+def fetcher():
+    # Không cần YouTubeTranscriptApi cho _clean_segments
+    return YouTubeTranscriptFetcher.__new__(YouTubeTranscriptFetcher)
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_sample_matches_legacy(fetcher, text):
+    # Caption đầu tiên luôn có dòng đầu khác rỗng (khác biệt có chủ đích duy nhất)
+    segments = [
+        SimpleNamespace(text=SAMPLES[0], start=0.5, duration=2.0),
+        SimpleNamespace(text=text, start=2.75, duration=3.25),
+    ]
+    assert fetcher._clean_segments(segments).timestamped() == legacy_pipeline(segments)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_synthetic_corpus_matches_legacy(fetcher, seed):
+    segments = synthetic_segments(2000, seed=seed)
+    assert fetcher._clean_segments(segments).timestamped() == legacy_pipeline(segments)